@@ -0,0 +1,355 @@
+"""Adım programının statik analizi ve iyileştirilmesi.
+
+analyze() her fonksiyonun akış grafiğini (next_ok/next_fail ve "Resimlerden Birini Bekle" dalları)
+kurar; geçersiz ya da aralık dışı atlamaları, ulaşılamayan adımları, olmayan ya da özyinelemeli
+fonksiyon çağrılarını ve içinde hiç bekleme olmayan (CPU'yu boşuna döndüren) döngüleri bildirir.
+
+optimize() aynı davranışta daha kısa bir program üretir: her iki sonucu da aynı yere giden "Eğer"
+adımları üzerinden geçen atlamalar doğrudan hedefe bağlanır, aynı şablonu ard arda bekleyen adımlar
+tek adımda birleştirilir ve ulaşılamayan adımlar silinir. Kalan adımlar "origin" alanında özgün
+numaralarını taşır (durum mesajları ve izler özgün numarayı gösterir).
+
+Atlama hedefleri 1 tabanlı adım numaralarıdır; n+1 fonksiyonu bitirir.
+"""
+
+import copy
+from dataclasses import dataclass
+
+from engine import (
+    IMAGE_OPS, NUMBER_DEFAULTS, OP_CALL, OP_CLICK, OP_IF, OP_SET_VAR, OP_WAIT_ANY, OP_WAIT_APPEAR, OP_WAIT_DISAPPEAR, OPS,
+    parse_increment, parse_jump, parse_number, parse_value,
+)
+
+ERROR = "error"
+WARNING = "warning"
+
+# Döngüde bulunması CPU'nun boşa dönmediğini gösteren işlemler (ekran yakalar, bekler ya da fareyi hareket ettirir)
+WAITING_OPS = (OP_CLICK, OP_WAIT_APPEAR, OP_WAIT_DISAPPEAR, OP_WAIT_ANY)
+# Birleştirilebilen beklemelerde aynı olması gereken alanlar
+_WAIT_KEY_FIELDS = ("op", "image", "region", "confidence", "poll_mode", "color_mode", "scales")
+
+# Akış grafiğinde "fonksiyondan çık"
+EXIT = -1
+
+
+@dataclass
+class Issue:
+    severity: str
+    func: str
+    step: int | None
+    message: str
+
+    def __str__(self) -> str:
+        where = f"{self.func} #{self.step}" if self.step is not None else self.func
+        return f"[{'hata' if self.severity == ERROR else 'uyarı'}] {where}: {self.message}"
+
+
+@dataclass
+class Optimized:
+    functions: dict[str, list[dict]]
+    removed: int = 0
+    threaded: int = 0
+    merged: int = 0
+
+    def summary(self) -> str:
+        return f"{self.removed} ölü adım silindi, {self.threaded} atlama kısaltıldı, {self.merged} bekleme birleştirildi"
+
+
+def _parse_target(value, default, count: int, fallback: str):
+    # (hedef indeks, EXIT ya da default; hata mesajı). Değer motorla aynı şekilde (engine.parse_jump)
+    # çözülür: boş ya da geçersiz → default, aralık dışı → çıkış; analiz geçersiz değerleri ayrıca bildirir.
+    target = parse_jump(value)
+    if target is None:
+        if value is None or value == "":
+            return default, None
+        return default, f"geçersiz atlama hedefi '{value}' ({fallback})"
+    if 0 <= target < count:
+        return target, None
+    if target == count:
+        return EXIT, None
+    return EXIT, f"atlama hedefi {value} aralık dışında (1–{count + 1}; fonksiyon sonlanır)"
+
+
+class _Graph:
+    """Bir fonksiyonun akış grafiği: her adım için başarı, başarısızlık ve dal hedefleri."""
+
+    def __init__(self, steps: list[dict]) -> None:
+        self.steps = steps
+        count = len(steps)
+        self.ok: list[int] = []
+        self.fail: list[int] = []
+        self.branches: list[list[int | None]] = []
+        # (adım indeksi, mesaj)
+        self.errors: list[tuple[int, str]] = []
+        for i, step in enumerate(steps):
+            following = i + 1 if i + 1 < count else EXIT
+            ok, err = _parse_target(step.get("next_ok"), following, count, "sıradaki adıma geçilir")
+            if err:
+                self.errors.append((i, f"Başarılı→ {err}"))
+            fail, err = _parse_target(step.get("next_fail"), following, count, "sıradaki adıma geçilir")
+            if err:
+                self.errors.append((i, f"Başarısız→ {err}"))
+            branches: list[int | None] = []
+            if step.get("op") == OP_WAIT_ANY:
+                for branch in step.get("images") or []:
+                    # None: dal hedefi yok, motor Başarılı→ hedefine gider
+                    target, err = _parse_target(branch.get("next"), None, count, "Başarılı→ hedefine gidilir")
+                    if err:
+                        self.errors.append((i, f"dal {branch.get('image') or ''}: {err}"))
+                    branches.append(target)
+            self.ok.append(ok)
+            self.fail.append(fail)
+            self.branches.append(branches)
+
+    def successors(self, i: int) -> list[int]:
+        step = self.steps[i]
+        op = step.get("op")
+        if op not in OPS or (op == OP_SET_VAR and (not (step.get("var_name") or "").strip() or _bad_increment(step))):
+            # Her zaman başarısız
+            out = [self.fail[i]]
+        elif op == OP_SET_VAR:
+            out = [self.ok[i]]
+        elif op == OP_WAIT_ANY:
+            # Başarıda bulunan görselin dalına, dalı boşsa next_ok'a gidilir
+            out = [self.ok[i] if t is None else t for t in self.branches[i]] + [self.fail[i]]
+        else:
+            out = [self.ok[i], self.fail[i]]
+        return [t for t in dict.fromkeys(out) if t != EXIT]
+
+    def reachable(self, entry: int = 0) -> set[int]:
+        seen: set[int] = set()
+        pending = [entry] if self.steps else []
+        while pending:
+            i = pending.pop()
+            if i in seen:
+                continue
+            seen.add(i)
+            pending.extend(self.successors(i))
+        return seen
+
+
+def _strongly_connected(nodes, successors) -> list[list]:
+    # Tarjan (özyinelemesiz; binlerce adımda da yığın taşmaz)
+    index: dict = {}
+    low: dict = {}
+    on_stack: set = set()
+    stack: list = []
+    result: list[list] = []
+    counter = 0
+    for root in nodes:
+        if root in index:
+            continue
+        work = [(root, iter(successors(root)))]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, it = work[-1]
+            advanced = False
+            for nxt in it:
+                if nxt not in index:
+                    index[nxt] = low[nxt] = counter
+                    counter += 1
+                    stack.append(nxt)
+                    on_stack.add(nxt)
+                    work.append((nxt, iter(successors(nxt))))
+                    advanced = True
+                    break
+                if nxt in on_stack:
+                    low[node] = min(low[node], index[nxt])
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                low[work[-1][0]] = min(low[work[-1][0]], low[node])
+            if low[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                result.append(component)
+    return result
+
+
+def _callees(steps: list[dict]) -> list[str]:
+    return [s["call_func"] for s in steps if s.get("op") == OP_CALL and s.get("call_func")]
+
+
+def _waiting_functions(functions: dict[str, list[dict]]) -> set[str]:
+    # Kendisi ya da çağırdığı bir fonksiyon bekleme içerenler
+    waiting = {name for name, steps in functions.items() if any(s.get("op") in WAITING_OPS for s in steps)}
+    changed = True
+    while changed:
+        changed = False
+        for name, steps in functions.items():
+            if name not in waiting and any(c in waiting for c in _callees(steps)):
+                waiting.add(name)
+                changed = True
+    return waiting
+
+
+def _bad_increment(step: dict) -> bool:
+    # "+=N" değerinde N tamsayı değil (engine.Step adımı çalışınca başarısız sayar)
+    try:
+        parse_increment(parse_value(step.get("var_value", ""), step.get("var_type", "string")))
+    except ValueError:
+        return True
+    return False
+
+
+def _bad_numbers(step: dict) -> list[str]:
+    # Sayıya çevrilemeyen alanlar (engine.parse_number bunların yerine varsayılanı kullanır)
+    bad = []
+    for key in NUMBER_DEFAULTS:
+        if step.get(key) is None:
+            continue
+        try:
+            float(step[key])
+        except (TypeError, ValueError):
+            bad.append(key)
+    return bad
+
+
+def _format_numbers(indices) -> str:
+    return ", ".join(str(i + 1) for i in sorted(indices))
+
+
+def analyze(functions: dict[str, list[dict]]) -> list[Issue]:
+    """Tüm fonksiyonları denetler; hatalar (yanlış çalışacak) önce, uyarılar sonra döner."""
+    issues: list[Issue] = []
+    waiting = _waiting_functions(functions)
+    for name, steps in functions.items():
+        graph = _Graph(steps)
+        for i, message in graph.errors:
+            issues.append(Issue(ERROR, name, i + 1, message))
+        for i, step in enumerate(steps):
+            op = step.get("op")
+            if op not in OPS:
+                issues.append(Issue(ERROR, name, i + 1, f"bilinmeyen işlem '{op}'"))
+            elif op in IMAGE_OPS and not step.get("image"):
+                issues.append(Issue(ERROR, name, i + 1, "görsel seçilmemiş"))
+            elif op == OP_WAIT_ANY and not step.get("images"):
+                issues.append(Issue(ERROR, name, i + 1, "beklenecek görsel yok"))
+            elif op == OP_CALL and step.get("call_func") not in functions:
+                issues.append(Issue(ERROR, name, i + 1, f"olmayan fonksiyon çağrılıyor: '{step.get('call_func') or ''}'"))
+            elif op == OP_SET_VAR and not (step.get("var_name") or "").strip():
+                issues.append(Issue(WARNING, name, i + 1, "değişken adı boş (adım her zaman başarısız olur)"))
+            elif op == OP_SET_VAR and _bad_increment(step):
+                issues.append(Issue(ERROR, name, i + 1, f"geçersiz artırma değeri '{step.get('var_value')}' (adım her zaman başarısız olur)"))
+            for key in _bad_numbers(step):
+                issues.append(Issue(WARNING, name, i + 1, f"geçersiz sayı {key}='{step[key]}' (varsayılan {NUMBER_DEFAULTS[key]:g} kullanılır)"))
+        reachable = graph.reachable()
+        unreachable = set(range(len(steps))) - reachable
+        if unreachable:
+            issues.append(Issue(WARNING, name, None, f"ulaşılamayan adımlar: {_format_numbers(unreachable)}"))
+        for component in _strongly_connected(sorted(reachable), graph.successors):
+            looping = len(component) > 1 or component[0] in graph.successors(component[0])
+            if not looping:
+                continue
+            if any(steps[i].get("op") in WAITING_OPS or (steps[i].get("op") == OP_CALL and steps[i].get("call_func") in waiting) for i in component):
+                continue
+            issues.append(Issue(WARNING, name, min(component) + 1, f"beklemesiz döngü (adımlar {_format_numbers(component)}): işlemciyi sürekli meşgul eder"))
+
+    def called(func: str) -> list[str]:
+        return [c for c in _callees(functions.get(func, [])) if c in functions]
+
+    for component in _strongly_connected(list(functions), called):
+        if len(component) > 1 or component[0] in called(component[0]):
+            cycle = " → ".join(component + [component[0]])
+            issues.append(Issue(WARNING, component[0], None, f"özyinelemeli çağrı: {cycle}"))
+    issues.sort(key=lambda issue: issue.severity != ERROR)
+    return issues
+
+
+def _is_jump(step: dict, graph: _Graph, i: int) -> bool:
+    # Her iki sonucu da aynı yere giden "Eğer": yalnızca bir atlama
+    return step.get("op") == OP_IF and graph.ok[i] == graph.fail[i]
+
+
+def _optimize_function(steps: list[dict], result: Optimized) -> list[dict]:
+    count = len(steps)
+    if not count:
+        return []
+    graph = _Graph(steps)
+    steps = [copy.deepcopy(s) for s in steps]
+
+    def forward(target: int | None) -> int | None:
+        # Eğer-atlamaları üzerinden son hedefe (kendine dönen atlama zincirinde durur)
+        seen = set()
+        while target is not None and target != EXIT and target not in seen and _is_jump(steps[target], graph, target):
+            seen.add(target)
+            target = graph.ok[target]
+        return target
+
+    for i in range(count):
+        targets = [forward(t) for t in (graph.ok[i], graph.fail[i], *graph.branches[i])]
+        result.threaded += sum(new != old for new, old in zip(targets, (graph.ok[i], graph.fail[i], *graph.branches[i])))
+        graph.ok[i], graph.fail[i], graph.branches[i] = targets[0], targets[1], targets[2:]
+
+    preds: dict[int, set[int]] = {i: set() for i in range(count)}
+    for j in range(count):
+        for t in graph.successors(j):
+            preds[t].add(j)
+
+    # Aynı şablonu ard arda bekleyen adımlar: ilki her iki sonuçta da ikinciye geçiyorsa ve ikinciye başka
+    # yerden gelinmiyorsa ikisi toplam süreli tek bekleme olur; ilke gelen atlamalar ikinciye bağlanır
+    merged: set[int] = set()
+    for i in range(count - 1):
+        a, b = steps[i], steps[i + 1]
+        if a.get("op") not in (OP_WAIT_APPEAR, OP_WAIT_DISAPPEAR) or any(a.get(f) != b.get(f) for f in _WAIT_KEY_FIELDS):
+            continue
+        if graph.ok[i] != i + 1 or graph.fail[i] != i + 1 or preds[i + 1] != {i}:
+            continue
+        b["timeout_sec"] = parse_number(a, "timeout_sec") + parse_number(b, "timeout_sec")
+        b["poll_sec"] = min(parse_number(a, "poll_sec"), parse_number(b, "poll_sec"))
+        b["origin"] = a.get("origin", i + 1)
+        for j in preds[i]:
+            graph.ok[j] = i + 1 if graph.ok[j] == i else graph.ok[j]
+            graph.fail[j] = i + 1 if graph.fail[j] == i else graph.fail[j]
+            graph.branches[j] = [i + 1 if t == i else t for t in graph.branches[j]]
+        preds[i + 1] = preds[i]
+        merged.add(i)
+        result.merged += 1
+
+    # Giriş ilk adımdır; ilk adımlar birleştirildiyse giriş onları devralan adımdır
+    entry = 0
+    while entry in merged:
+        entry += 1
+    kept = sorted(graph.reachable(entry))
+    result.removed += count - len(kept) - len(merged)
+    position = {old: new for new, old in enumerate(kept)}
+    total = len(kept)
+
+    def encode(target: int | None, new: int) -> str | None:
+        # Sıradaki adıma gidiyorsa boş; çıkış n+1. Hiç izlenmeyen (ör. başarısız olamayan adımın) silinmiş hedefi de boş.
+        if target not in (None, EXIT) and target not in position:
+            return None
+        resolved = total if target in (None, EXIT) else position[target]
+        return None if resolved == new + 1 else str(resolved + 1)
+
+    out: list[dict] = []
+    for new, old in enumerate(kept):
+        step = steps[old]
+        step.setdefault("origin", old + 1)
+        step["next_ok"] = encode(graph.ok[old], new)
+        step["next_fail"] = encode(graph.fail[old], new)
+        for branch, target in zip(step.get("images") or [], graph.branches[old]):
+            # Dal hedefi next_ok ile aynıysa boş bırakılır (motor boş dalı next_ok'a gönderir)
+            if target is None or target == graph.ok[old]:
+                branch["next"] = None
+            else:
+                branch["next"] = str((total if target == EXIT else position[target]) + 1)
+        out.append(step)
+    return out
+
+
+def optimize(functions: dict[str, list[dict]]) -> Optimized:
+    """Davranışı değiştirmeden sadeleştirilmiş kopya; özgün adımlar değiştirilmez."""
+    result = Optimized({})
+    for name, steps in functions.items():
+        result.functions[name] = _optimize_function(steps, result)
+    return result
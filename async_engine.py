@@ -0,0 +1,176 @@
+"""Adım programının asyncio ile çalıştırılması: görsel beklemeleri await edilebilir, alt fonksiyon
+çağrıları eşyordamdır. Birçok bot/izleyici tek süreçte, bot başına iş parçacığı açmadan aynı
+yakalama kaynağını paylaşarak koşabilir. Süre sınırı ve iptal iç içe "Fonksiyon Çağır" adımlarına yayılır.
+
+    asyncio.run(AsyncExecutionContext(compile_program(functions)).run("Varsayılan", timeout_sec=60))
+"""
+
+import asyncio
+import os
+import time
+
+from engine import (
+    OP_CALL,
+    OP_CLICK,
+    OP_IF,
+    OP_SET_VAR,
+    OP_WAIT_ANY,
+    OP_WAIT_APPEAR,
+    OP_WAIT_DISAPPEAR,
+    ExecutionContext,
+    Program,
+    Step,
+)
+from locate import click_image, wait_for_any_async, wait_for_appear_async, wait_for_disappear_async
+from tracing import CALL, STEP, tracer
+
+# op adı → async handler(ctx, step) -> bool
+ASYNC_OP_HANDLERS: dict = {}
+
+# Beklemesiz adımlar arka arkaya koşarken olay döngüsüne bu kadar adımda bir söz verilir
+_YIELD_EVERY = 100
+
+
+def register_async_op(name: str):
+    def decorator(func):
+        ASYNC_OP_HANDLERS[name] = func
+        return func
+    return decorator
+
+
+class AsyncExecutionContext(ExecutionContext):
+    """ExecutionContext'in asyncio karşılığı. deadline (time.monotonic) verilirse tüm beklemeler
+    ona göre kısaltılır; süre dolunca çalışma iptal edilir ve run() TimeoutError yükseltir."""
+
+    def __init__(self, program: Program, variables: dict | None = None, status=None, deadline: float | None = None) -> None:
+        super().__init__(program, variables, status)
+        self.deadline = deadline
+
+    def remaining(self, timeout_sec: float) -> float:
+        if self.deadline is None:
+            return timeout_sec
+        return max(0.0, min(timeout_sec, self.deadline - time.monotonic()))
+
+    async def run(self, func_name: str, timeout_sec: float | None = None) -> None:
+        # Üst seviye: hatalar ve iptal çağırana iletilir
+        if timeout_sec is not None:
+            deadline = time.monotonic() + timeout_sec
+            self.deadline = deadline if self.deadline is None else min(self.deadline, deadline)
+        steps = self.program.functions[func_name]
+        if self.deadline is None:
+            await run_steps_async(self, steps)
+        else:
+            await asyncio.wait_for(run_steps_async(self, steps), max(0.0, self.deadline - time.monotonic()))
+
+    async def call(self, func_name: str | None) -> bool:
+        # Alt fonksiyon: bilinmiyorsa ya da hata olursa False. İptal (CancelledError) yutulmaz, yukarı yayılır.
+        steps = self.program.functions.get(func_name) if func_name else None
+        if steps is None:
+            return False
+        try:
+            with tracer.span(func_name, CALL):
+                await run_steps_async(self, steps)
+            return True
+        except Exception:
+            return False
+
+
+async def run_steps_async(ctx: AsyncExecutionContext, steps: tuple[Step, ...]) -> None:
+    idx = 0
+    count = len(steps)
+    executed = 0
+    while 0 <= idx < count:
+        step = steps[idx]
+        handler = ASYNC_OP_HANDLERS.get(step.op)
+        # Aynı iş parçacığında eşzamanlı koşan görevlerin span'leri iç içe olmayabilir
+        with tracer.span(step.op, STEP, {"step": step.number, "image": step.label}):
+            if handler is not None:
+                ok = await handler(ctx, step)
+            else:
+                # Async karşılığı olmayan (ör. sonradan register_op ile eklenmiş) işlemler iş parçacığında çalışır
+                ok = await asyncio.to_thread(step.handler, ctx, step)
+        target = step.next_ok if ok else step.next_fail
+        if ctx.jump is not None:
+            target, ctx.jump = ctx.jump, None
+        idx = idx + 1 if target is None else target
+        executed += 1
+        if executed % _YIELD_EVERY == 0:
+            await asyncio.sleep(0)
+
+
+async def run_many(jobs, timeout_sec: float | None = None) -> list:
+    """[(ctx, func_name), ...] işlerini aynı olay döngüsünde eşzamanlı çalıştırır.
+    Her iş için None ya da yükselttiği istisna döner; bir işin hatası diğerlerini durdurmaz."""
+    return await asyncio.gather(*(ctx.run(name, timeout_sec) for ctx, name in jobs), return_exceptions=True)
+
+
+@register_async_op(OP_CLICK)
+async def _op_click(ctx: AsyncExecutionContext, step: Step) -> bool:
+    ctx.status(f"[{step.number}] Resme tıkla: {step.label}")
+    return await asyncio.to_thread(click_image, step.image, step.move_sec, step.confidence, None, step.region, step.color_mode, step.scales)
+
+
+@register_async_op(OP_WAIT_DISAPPEAR)
+async def _op_wait_disappear(ctx: AsyncExecutionContext, step: Step) -> bool:
+    ctx.status(f"[{step.number}] Kaybolmasını bekle: {step.label}")
+    return await wait_for_disappear_async(
+        step.image,
+        timeout_sec=ctx.remaining(step.timeout_sec),
+        poll_sec=step.poll_sec,
+        confidence=step.confidence,
+        region=step.region,
+        poll_mode=step.poll_mode,
+        stats=ctx.new_wait_stats(step),
+        color_mode=step.color_mode,
+        scales=step.scales,
+    )
+
+
+@register_async_op(OP_WAIT_APPEAR)
+async def _op_wait_appear(ctx: AsyncExecutionContext, step: Step) -> bool:
+    ctx.status(f"[{step.number}] Görünmesini bekle: {step.label}")
+    return await wait_for_appear_async(
+        step.image,
+        timeout_sec=ctx.remaining(step.timeout_sec),
+        poll_sec=step.poll_sec,
+        confidence=step.confidence,
+        region=step.region,
+        poll_mode=step.poll_mode,
+        stats=ctx.new_wait_stats(step),
+        color_mode=step.color_mode,
+        scales=step.scales,
+    )
+
+
+@register_async_op(OP_WAIT_ANY)
+async def _op_wait_any(ctx: AsyncExecutionContext, step: Step) -> bool:
+    ctx.status(f"[{step.number}] Birini bekle: {', '.join(os.path.basename(p) for p in step.branch_images)}")
+    index = await wait_for_any_async(
+        list(step.branch_images),
+        timeout_sec=ctx.remaining(step.timeout_sec),
+        poll_sec=step.poll_sec,
+        confidence=step.confidence,
+        region=step.region,
+        poll_mode=step.poll_mode,
+        pick=step.pick,
+        stats=ctx.new_wait_stats(step),
+        color_mode=step.color_mode,
+        scales=step.scales,
+    )
+    if index is None:
+        return False
+    ctx.jump = step.branch_targets[index]
+    return True
+
+
+@register_async_op(OP_CALL)
+async def _op_call(ctx: AsyncExecutionContext, step: Step) -> bool:
+    ctx.status(f"[{step.number}] Fonksiyon çağır: {step.call_func}")
+    return await ctx.call(step.call_func)
+
+
+@register_async_op(OP_SET_VAR)
+@register_async_op(OP_IF)
+async def _op_inline(ctx: AsyncExecutionContext, step: Step) -> bool:
+    # Değişken işlemleri beklemez; senkron handler doğrudan çağrılır
+    return step.handler(ctx, step)
@@ -0,0 +1,211 @@
+"""Şablon bulma kıyaslaması (ekran gerekmez): 1080p/1440p/4K sentetik ekranlar, farklı boyutta
+şablonlar (gürültü ve ölçekleme bozulmasıyla), her eşleyici, yakalama kaynağı ve renk modu, birkaç eşik değeri.
+try_locate_on_screen yolu ölçülür; gecikme yüzdelikleri, saniyedeki çağrı ve tepe bellek raporlanır.
+
+    python bench_locate.py --out bench_results/locate.json
+    python bench_locate.py --sizes 1080p --compare bench_results/locate.json   # %20'den yavaşsa çıkış kodu 1
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from PIL import Image, ImageStat
+
+import matchers
+from frames import ReplaySource, frame_provider, make_source
+from locate import locate_hints, try_locate_on_screen
+from templates import template_cache
+
+SIZES = {"1080p": (1920, 1080), "1440p": (2560, 1440), "4k": (3840, 2160)}
+NEEDLES = {"small": (32, 24), "medium": (96, 64), "large": (240, 160)}
+# None: varsayılan (tam eşleşmeye yakın) eşik
+CONFIDENCES = (None, 0.95, 0.8)
+
+
+def _parse_confidence(text: str) -> float | None:
+    return None if text in ("none", "default") else float(text)
+
+
+def _artifact(needle: Image.Image, rng: random.Random, confidence: float | None) -> Image.Image:
+    # Varsayılan eşik birebir kopya bekler; diğer eşiklerde gürültü, düşük eşiklerde ölçekleme bozulması da eklenir
+    if confidence is None:
+        return needle
+    w, h = needle.size
+    if confidence < 0.9:
+        needle = needle.resize((max(1, round(w * 0.9)), max(1, round(h * 0.9))), Image.BILINEAR).resize((w, h), Image.BILINEAR)
+    noise = Image.frombytes("RGB", (w, h), rng.randbytes(w * h * 3))
+    return Image.blend(needle, noise, 0.03)
+
+
+def _textured_position(screen: Image.Image, w: int, h: int, rng: random.Random) -> tuple[int, int]:
+    # Düz arka plan parçası ekranda birçok yerde birebir bulunur; "bulundu" ölçümü için dokulu bir yer seç
+    for _ in range(200):
+        x, y = rng.randrange(screen.width - w), rng.randrange(screen.height - h)
+        if sum(ImageStat.Stat(screen.crop((x, y, x + w, y + h))).stddev) > 60:
+            break
+    return x, y
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    k = (len(ordered) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def _git_revision() -> str | None:
+    try:
+        here = os.path.dirname(os.path.abspath(__file__))
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=here, capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_case(needle_path: str, expected: tuple[int, int], confidence, repeat: int, keep_hints: bool, color_mode: str = "rgb") -> dict:
+    latencies = []
+    found = 0
+    for _ in range(repeat):
+        if not keep_hints:
+            locate_hints.forget(needle_path)
+        start = time.perf_counter()
+        # max_age=0: her çağrı yeni kare alır (yakalama maliyeti dahil)
+        box = try_locate_on_screen(needle_path, confidence, max_age=0, color_mode=color_mode)
+        latencies.append(time.perf_counter() - start)
+        found += bool(box) and (box.left, box.top) == expected
+    # Tepe bellek ayrı bir çağrıda ölçülür (tracemalloc zamanlamayı bozmasın)
+    if not keep_hints:
+        locate_hints.forget(needle_path)
+    tracemalloc.start()
+    try_locate_on_screen(needle_path, confidence, max_age=0, color_mode=color_mode)
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    total = sum(latencies)
+    return {
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 3),
+        "p90_ms": round(_percentile(latencies, 90) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "throughput_per_sec": round(len(latencies) / total, 2) if total else None,
+        "peak_mb": round(peak / 2**20, 2),
+        "found": f"{found}/{repeat}",
+    }
+
+
+def run_benchmark(args) -> list[dict]:
+    results = []
+    workdir = tempfile.mkdtemp(prefix="bench_locate_")
+    matcher_names = [m for m in args.matchers.split(",") if m]
+    source_names = [s for s in args.sources.split(",") if s]
+    for size_name in args.sizes.split(","):
+        size = SIZES[size_name]
+        # Her senaryo kendi tohumundan üretilir; seçilen alt küme değişse de aynı girdiler oluşur
+        screen = matchers.synthetic_screen(random.Random(f"{args.seed}:{size_name}"), size)
+        screen_path = os.path.join(workdir, f"screen_{size_name}.png")
+        screen.save(screen_path)
+        for needle_name in args.needles.split(","):
+            nw, nh = NEEDLES[needle_name]
+            rng = random.Random(f"{args.seed}:{size_name}:{needle_name}")
+            x, y = _textured_position(screen, nw, nh, rng)
+            for confidence in (_parse_confidence(c) for c in args.confidences.split(",")):
+                needle = _artifact(screen.crop((x, y, x + nw, y + nh)), random.Random(f"{args.seed}:{size_name}:{needle_name}:{confidence}"), confidence)
+                needle_path = os.path.join(workdir, f"needle_{size_name}_{needle_name}_{confidence}.png")
+                needle.save(needle_path)
+                template_cache.get(needle_path)
+                for source_name in source_names:
+                    source = ReplaySource(screen_path, interval=0) if source_name == "replay" else make_source(source_name)
+                    frame_provider.set_source(source)
+                    for matcher_name, color_mode in ((m, c) for m in matcher_names for c in args.color_modes.split(",")):
+                        matcher = matchers.MATCHERS.get(matcher_name)
+                        if matcher is None or not matcher.available():
+                            continue
+                        matchers.set_matcher(matcher_name)
+                        row = {
+                            "size": size_name,
+                            "needle": needle_name,
+                            "confidence": confidence,
+                            "matcher": matcher_name,
+                            "source": source_name,
+                            "color_mode": color_mode,
+                        }
+                        row.update(run_case(needle_path, (x, y), confidence, args.repeat, args.hints, color_mode))
+                        results.append(row)
+                        print(
+                            f"{size_name:>5} {needle_name:>6} conf={str(confidence):>4} {matcher_name:>9} {source_name:>9} {color_mode:>4}  "
+                            f"p50 {row['p50_ms']:8.1f} ms  p90 {row['p90_ms']:8.1f} ms  {row['throughput_per_sec']:7.2f}/s  "
+                            f"{row['peak_mb']:7.1f} MB  bulundu {row['found']}",
+                            flush=True,
+                        )
+    matchers.set_matcher(None)
+    return results
+
+
+def _key(row: dict) -> tuple:
+    # Renk modu eklenmeden önce kaydedilmiş sonuçlar rgb sayılır
+    return row["size"], row["needle"], row["confidence"], row["matcher"], row["source"], row.get("color_mode", "rgb")
+
+
+def compare(results: list[dict], baseline_path: str, tolerance: float) -> bool:
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {_key(r): r for r in json.load(f)["results"]}
+    ok = True
+    for row in results:
+        old = baseline.get(_key(row))
+        if old is None or not old["p50_ms"]:
+            continue
+        ratio = row["p50_ms"] / old["p50_ms"]
+        regressed = ratio > 1.0 + tolerance
+        ok &= not regressed
+        mark = "GERİLEME" if regressed else ""
+        print(f"{' '.join(str(k) for k in _key(row)):<40} p50 {old['p50_ms']:8.1f} → {row['p50_ms']:8.1f} ms  x{ratio:5.2f} {mark}")
+    return ok
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="try_locate_on_screen kıyaslaması (sentetik ekranlar).")
+    parser.add_argument("--sizes", default=",".join(SIZES))
+    parser.add_argument("--needles", default=",".join(NEEDLES))
+    parser.add_argument("--confidences", default=",".join("none" if c is None else str(c) for c in CONFIDENCES), help="Virgülle ayrılmış eşikler; none = varsayılan")
+    parser.add_argument("--matchers", default=",".join(matchers.MATCHERS))
+    parser.add_argument("--color-modes", default="rgb", help="Virgülle ayrılmış renk modları: " + ", ".join(matchers.COLOR_MODES))
+    parser.add_argument("--sources", default="replay", help="replay (ekransız) ve/veya mss, pyautogui")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--hints", action="store_true", help="Son konum ipuçlarını açık bırak (varsayılan: her çağrı tam arama)")
+    parser.add_argument("--out", help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument("--compare", help="Karşılaştırılacak önceki sonuç dosyası")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="İzin verilen p50 yavaşlama oranı")
+    args = parser.parse_args(argv)
+
+    if not matchers.available():
+        print("numpy bulunamadı")
+        return 1
+    results = run_benchmark(args)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        meta = {
+            "revision": _git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeat": args.repeat,
+            "seed": args.seed,
+        }
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"meta": meta, "results": results}, f, ensure_ascii=False, indent=2)
+    if args.compare:
+        return 0 if compare(results, args.compare, args.tolerance) else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""Açılış süresi ölçümü: düzenleyici (main) ve başsız çalıştırıcı (runner) modüllerinin
+içe aktarılma süresi ayrı süreçlerde ölçülür ve bütçeyle karşılaştırılır.
+
+    python bench_startup.py              # bütçe aşılırsa ya da ağır modül yüklenirse çıkış kodu 1
+    python bench_startup.py --repeat 10 --json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# modül → saniye cinsinden içe aktarma bütçesi (soğuk olmayan, ardışık çalıştırmaların medyanı)
+BUDGETS = {
+    "runner": 0.30,
+    "main": 0.40,
+}
+
+# Açılışta yüklenmemesi gereken, ilk kullanımda yüklenen ağır modüller
+LAZY_MODULES = ("PySide6", "numpy", "cv2", "pyautogui", "mss")
+
+_CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"elapsed": elapsed, "loaded": [m for m in {lazy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module: str, repeat: int) -> dict:
+    here = os.path.dirname(os.path.abspath(__file__))
+    code = _CHILD.format(module=module, lazy=LAZY_MODULES)
+    samples = []
+    loaded: set[str] = set()
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", code], cwd=here, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        samples.append(result["elapsed"])
+        loaded.update(result["loaded"])
+    return {
+        "module": module,
+        "median_sec": round(statistics.median(samples), 4),
+        "max_sec": round(max(samples), 4),
+        "budget_sec": BUDGETS[module],
+        "eager_heavy_modules": sorted(loaded),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="İçe aktarma süresi bütçesini denetler.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Sonuçları JSON olarak yaz")
+    parser.add_argument("modules", nargs="*", default=list(BUDGETS), help="Ölçülecek modüller")
+    args = parser.parse_args(argv)
+
+    results = [measure(m, max(1, args.repeat)) for m in args.modules]
+    ok = all(r["median_sec"] <= r["budget_sec"] and not r["eager_heavy_modules"] for r in results)
+    if args.json:
+        print(json.dumps({"ok": ok, "results": results}, ensure_ascii=False, indent=2))
+    else:
+        for r in results:
+            state = "OK" if r["median_sec"] <= r["budget_sec"] and not r["eager_heavy_modules"] else "AŞILDI"
+            extra = f"  erken yüklenen: {', '.join(r['eager_heavy_modules'])}" if r["eager_heavy_modules"] else ""
+            print(f"{r['module']:<8} medyan {r['median_sec'] * 1000:7.1f} ms  (bütçe {r['budget_sec'] * 1000:.0f} ms)  {state}{extra}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+"""Tek dosyalık bot paketi (.botz): adım programı, içerik özetiyle adlandırılmış şablonlar ve
+isteğe bağlı olarak renk moduna çevrilmiş ham diziler (.npy) bir zip içinde taşınır.
+
+    python bundle.py macro_bot.json macro_bot.botz --modes rgb,gray
+
+Diziler sıkıştırılmadan saklanır; yüklerken zip içinden doğrudan belleğe eşlenir (mmap), PNG
+çözülmez. Şablonlar template_cache'e kaydedilir ve ilk kullanımda okunur, bu yüzden yükleme
+yalnızca zip dizinini ve bot.json'u okur.
+"""
+
+import argparse
+import copy
+import hashlib
+import io
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+import zipfile
+
+from PIL import Image
+
+import matchers
+from templates import template_cache
+
+BUNDLE_EXT = ".botz"
+BUNDLE_VERSION = 1
+PROGRAM_NAME = "bot.json"
+
+# Zip yerel dosya başlığı: sabit 30 bayt, ardından ad ve ek alan
+_LOCAL_HEADER = struct.Struct("<4s22xHH")
+
+
+def _image_refs(functions: dict) -> list[dict]:
+    # "image" alanı taşıyan tüm sözlükler (adımlar ve OP_WAIT_ANY dalları)
+    refs = []
+    for steps in functions.values():
+        for step in steps or []:
+            if step.get("image"):
+                refs.append(step)
+            refs.extend(b for b in step.get("images") or [] if b.get("image"))
+    return refs
+
+
+def _bundle_modes(data: dict) -> list[str]:
+    # rgb her zaman; ayrıca botun ve adımların kullandığı renk modları
+    modes = {"rgb", data.get("color_mode") or "rgb"}
+    for steps in data["functions"].values():
+        modes.update(step["color_mode"] for step in steps or [] if step.get("color_mode"))
+    return [m for m in matchers.COLOR_MODES if m in modes]
+
+
+def _npy_bytes(image: Image.Image) -> bytes:
+    np = matchers._numpy()
+    buf = io.BytesIO()
+    np.save(buf, np.ascontiguousarray(matchers.to_array(image, "uint8")))
+    return buf.getvalue()
+
+
+def save_bundle(data: dict, path: str, arrays: bool = True, modes=None) -> dict:
+    """Bot verisini (save_bot biçimi) paket olarak yazar. arrays=True ve numpy varsa her şablonun
+    verilen renk modlarındaki dizileri de eklenir (varsayılan: botta kullanılan modlar). Özet sözlüğü döner."""
+    data = copy.deepcopy(data)
+    arrays = arrays and matchers.available()
+    modes = list(modes) if modes else _bundle_modes(data)
+    if "rgb" not in modes:
+        modes.insert(0, "rgb")
+    index: dict[str, dict] = {}
+    by_path: dict[str, str] = {}
+    # Yazma yarıda kalırsa (eksik görsel, dolu disk...) geçici dosya silinir, var olan paket bozulmaz
+    tmp = path + ".tmp"
+    try:
+        with zipfile.ZipFile(tmp, "w") as zf:
+            for ref in _image_refs(data["functions"]):
+                source = os.path.abspath(ref["image"])
+                name = by_path.get(source)
+                if name is None:
+                    with open(source, "rb") as f:
+                        raw = f.read()
+                    digest = hashlib.sha256(raw).hexdigest()[:20]
+                    if digest in index:
+                        # Aynı içerikli başka dosya: tek kopya
+                        name = by_path[source] = index[digest]["file"]
+                    else:
+                        name = by_path[source] = f"templates/{digest}{os.path.splitext(source)[1].lower() or '.png'}"
+                        # PNG zaten sıkıştırılmış; yeniden sıkıştırmak yalnızca yavaşlatır
+                        zf.writestr(name, raw, zipfile.ZIP_STORED)
+                        with Image.open(io.BytesIO(raw)) as img:
+                            image = img.convert("RGB")
+                        entry = index[digest] = {"file": name, "size": list(image.size), "arrays": {}}
+                        if arrays:
+                            for mode in modes:
+                                member = f"arrays/{digest}.{mode}.npy"
+                                zf.writestr(member, _npy_bytes(matchers.convert_mode(image, mode)), zipfile.ZIP_STORED)
+                                entry["arrays"][mode] = member
+                ref["image"] = name
+            data["bundle"] = {"version": BUNDLE_VERSION, "templates": index}
+            zf.writestr(PROGRAM_NAME, json.dumps(data, ensure_ascii=False, indent=2), zipfile.ZIP_DEFLATED)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return {"templates": len(index), "arrays": sum(len(e["arrays"]) for e in index.values()), "modes": modes if arrays else []}
+
+
+class _BundleFile:
+    """Paket dosyasının tamamı tek bir salt okunur mmap olarak açılır; sıkıştırılmamış üyeler
+    (PNG ve .npy) kopyalanmadan bu eşlemenin dilimleri olarak okunur."""
+
+    def __init__(self, path: str, infos: dict[str, zipfile.ZipInfo]) -> None:
+        self.path = path
+        self.infos = infos
+        self._map: mmap.mmap | None = None
+        self._lock = threading.Lock()
+
+    def _buffer(self) -> mmap.mmap:
+        with self._lock:
+            if self._map is None:
+                with open(self.path, "rb") as f:
+                    self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return self._map
+
+    def _data_offset(self, info: zipfile.ZipInfo) -> int:
+        buf = self._buffer()
+        magic, name_len, extra_len = _LOCAL_HEADER.unpack_from(buf, info.header_offset)
+        if magic != b"PK\x03\x04":
+            raise ValueError(f"Bozuk paket üyesi: {info.filename}")
+        return info.header_offset + _LOCAL_HEADER.size + name_len + extra_len
+
+    def member(self, name: str) -> bytes:
+        info = self.infos[name]
+        if info.compress_type != zipfile.ZIP_STORED:
+            with zipfile.ZipFile(self.path) as zf:
+                return zf.read(info)
+        offset = self._data_offset(info)
+        return self._buffer()[offset:offset + info.file_size]
+
+    def array(self, name: str, shape: tuple[int, ...]):
+        # save_bundle'ın yazdığı .npy: uint8, C sıralı; yalnızca başlık uzunluğu okunur
+        np = matchers._numpy()
+        info = self.infos[name]
+        if info.compress_type != zipfile.ZIP_STORED:
+            return np.load(io.BytesIO(self.member(name)))
+        buf = self._buffer()
+        offset = self._data_offset(info)
+        if buf[offset:offset + 6] != b"\x93NUMPY":
+            raise ValueError(f"Bozuk dizi: {name}")
+        major = buf[offset + 6]
+        header_len = struct.unpack_from("<H" if major == 1 else "<I", buf, offset + 8)[0]
+        start = offset + (10 if major == 1 else 12) + header_len
+        return np.frombuffer(buf, dtype=np.uint8, count=math.prod(shape), offset=start).reshape(shape)
+
+    def decode(self, name: str) -> Image.Image:
+        with Image.open(io.BytesIO(self.member(name))) as img:
+            img.load()
+            return img.convert("RGB")
+
+
+def _array_image(arr) -> Image.Image:
+    # (h, w, 1) → L, (h, w, 3) → RGB
+    return Image.fromarray(arr[:, :, 0] if arr.shape[2] == 1 else arr)
+
+
+def _register(bundle: _BundleFile, name: str, entry: dict) -> str:
+    # Paket içindeki şablon için sanal yol: <paket>/<üye adı>
+    image_path = os.path.join(bundle.path, name)
+    width, height = entry["size"]
+    arrays = {mode: member for mode, member in entry.get("arrays", {}).items() if member in bundle.infos}
+    if not matchers.available():
+        arrays = {}
+
+    def shape(mode: str) -> tuple[int, int, int]:
+        return height, width, 3 if mode == "rgb" else 1
+
+    def loader() -> Image.Image:
+        if "rgb" in arrays:
+            return _array_image(bundle.array(arrays["rgb"], shape("rgb")))
+        return bundle.decode(name)
+
+    prepared = {
+        ("needle", mode): (lambda mode=mode, member=member: matchers.Needle.prepared(_array_image(bundle.array(member, shape(mode))), mode))
+        for mode, member in arrays.items()
+    }
+    template_cache.register(image_path, loader, prepared)
+    return image_path
+
+
+def load_bundle(path: str, extract_to: str | None = None) -> dict:
+    """Paketi okur ve load_bot biçiminde veri döndürür. Şablonlar template_cache'e kaydedilir (görsel
+    yolları paketin içini gösteren sanal yollardır); extract_to verilirse bunun yerine o klasöre
+    (içerik özetiyle adlandırılmış dosyalar olarak) çıkarılır, ör. arayüzde düzenlemek için."""
+    path = os.path.abspath(path)
+    with zipfile.ZipFile(path) as zf:
+        data = json.loads(zf.read(PROGRAM_NAME))
+        infos = {info.filename: info for info in zf.infolist()}
+        bundle = data.pop("bundle", None) or {}
+        if not isinstance(data.get("functions"), dict) or bundle.get("version") != BUNDLE_VERSION:
+            raise ValueError(f"Geçersiz bot paketi: {path}")
+        entries = {entry["file"]: entry for entry in bundle.get("templates", {}).values()}
+        packed = _BundleFile(path, infos)
+        resolved: dict[str, str] = {}
+        for name, entry in entries.items():
+            if name not in infos:
+                raise ValueError(f"Pakette şablon eksik: {name}")
+            if extract_to is None:
+                resolved[name] = _register(packed, name, entry)
+                continue
+            target = os.path.join(extract_to, os.path.basename(name))
+            if not os.path.exists(target):
+                with open(target, "wb") as f:
+                    f.write(zf.read(infos[name]))
+            resolved[name] = target
+    for ref in _image_refs(data["functions"]):
+        ref["image"] = resolved.get(ref["image"], ref["image"])
+    return data
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bot JSON dosyasını tek dosyalık pakete (.botz) dönüştürür.")
+    parser.add_argument("bot", help="save_bot ile kaydedilmiş JSON dosyası")
+    parser.add_argument("out", help="Yazılacak paket (.botz)")
+    parser.add_argument("--modes", default="", help="Hazır dizisi eklenecek renk modları (varsayılan: botta kullanılanlar)")
+    parser.add_argument("--no-arrays", action="store_true", help="Yalnızca PNG şablonları ekle")
+    args = parser.parse_args(argv)
+
+    from engine import load_bot
+
+    modes = [m for m in args.modes.split(",") if m]
+    unknown = [m for m in modes if m not in matchers.COLOR_MODES]
+    if unknown:
+        parser.error(f"Bilinmeyen renk modu: {', '.join(unknown)}")
+    summary = save_bundle(load_bot(args.bot), args.out, arrays=not args.no_arrays, modes=modes)
+    print(json.dumps({"out": args.out, **summary}, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
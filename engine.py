@@ -0,0 +1,344 @@
+import json
+import os
+from collections import deque
+
+from locate import WaitStats, click_image, wait_for_any, wait_for_appear, wait_for_disappear
+from tracing import CALL, STEP, tracer
+
+
+OP_CLICK = "Resme Tıkla"
+OP_WAIT_DISAPPEAR = "Resmin Kaybolmasını Bekle"
+OP_WAIT_APPEAR = "Resmin Görünmesini Bekle"
+OP_CALL = "Fonksiyon Çağır"
+OP_SET_VAR = "Değişken Ata"
+OP_IF = "Eğer"
+OP_WAIT_ANY = "Resimlerden Birini Bekle"
+
+# Arayüzdeki sırayla
+OPS = (OP_CLICK, OP_WAIT_DISAPPEAR, OP_WAIT_APPEAR, OP_WAIT_ANY, OP_CALL, OP_SET_VAR, OP_IF)
+# Tek "image" alanı kullanan işlemler (OP_WAIT_ANY görsellerini "images" listesinde tutar)
+IMAGE_OPS = (OP_CLICK, OP_WAIT_DISAPPEAR, OP_WAIT_APPEAR)
+
+# op adı → handler(ctx, step) -> bool
+OP_HANDLERS: dict = {}
+
+
+def register_op(name: str):
+    def decorator(func):
+        OP_HANDLERS[name] = func
+        return func
+    return decorator
+
+
+def parse_value(value_str, value_type: str):
+    t = (value_type or "string").lower()
+    if t == "int":
+        try:
+            return int(value_str)
+        except Exception:
+            return 0
+    if t == "bool":
+        return str(value_str).strip().lower() in ("1", "true", "yes", "on")
+    return str(value_str)
+
+
+# Adımların sayısal alanları ve varsayılanları; geçersiz değer varsayılana döner (analiz uyarır)
+NUMBER_DEFAULTS = {"timeout_sec": 30.0, "poll_sec": 0.5, "move_ms": 150.0}
+
+
+def parse_number(raw: dict, key: str) -> float:
+    value = raw.get(key)
+    if value is None:
+        return NUMBER_DEFAULTS[key]
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return NUMBER_DEFAULTS[key]
+
+
+def parse_increment(value) -> int | None:
+    # "+=N" yalnızca string değerlerde artırma anlamına gelir; N tamsayı değilse ValueError
+    if not isinstance(value, str) or "+=" not in value:
+        return None
+    return int(value.replace("+=", ""))
+
+
+def parse_jump(value) -> int | None:
+    # 1 tabanlı adım numarası → 0 tabanlı indeks; boş/geçersizse None (sıradaki adıma geç).
+    # 0 boş sayılmaz: "0" gibi aralık dışıdır ve fonksiyonu bitirir (analysis._parse_target da böyle okur)
+    if value is None or value == "":
+        return None
+    try:
+        return int(value) - 1
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_scales(value) -> tuple[float, ...] | None:
+    # [0.8, 1, 1.25] ya da "0.8, 1, 1.25" → (0.8, 1.0, 1.25); boş/geçersizse None (tek ölçek)
+    if not value:
+        return None
+    items = value.replace(";", ",").split(",") if isinstance(value, str) else value
+    try:
+        scales = tuple(dict.fromkeys(float(s) for s in items if str(s).strip()))
+    except (TypeError, ValueError):
+        return None
+    if not scales or any(s <= 0 for s in scales):
+        return None
+    return scales
+
+
+class Step:
+    """Yükleme anında derlenmiş adım: alanlar çözülmüş, atlama hedefleri indekse çevrilmiş."""
+
+    __slots__ = (
+        "number", "op", "handler", "image", "label", "region", "confidence", "timeout_sec", "poll_sec", "poll_mode",
+        "move_sec", "call_func", "var_name", "value", "increment", "cmp_equal", "next_ok", "next_fail",
+        "branch_images", "branch_targets", "pick", "color_mode", "scales", "error",
+    )
+
+    def __init__(self, number: int, raw: dict, color_mode: str | None = None, scales=None) -> None:
+        self.number = number
+        self.op = raw.get("op")
+        self.handler = OP_HANDLERS.get(self.op, _op_unknown)
+        self.image = raw.get("image") or ""
+        self.label = os.path.basename(self.image)
+        self.region = tuple(raw["region"]) if raw.get("region") else None
+        self.confidence = raw.get("confidence")
+        self.timeout_sec = parse_number(raw, "timeout_sec")
+        self.poll_sec = parse_number(raw, "poll_sec")
+        self.poll_mode = raw.get("poll_mode") or "fixed"
+        self.move_sec = max(0.0, parse_number(raw, "move_ms") / 1000.0)
+        self.call_func = raw.get("call_func")
+        self.var_name = (raw.get("var_name") or "").strip()
+        self.value = parse_value(raw.get("var_value", ""), raw.get("var_type", "string"))
+        # Derlenemeyen alanın hatası adımda tutulur; program yüklenir, adım çalışınca başarısız olur
+        self.error = None
+        self.increment = None
+        if self.op == OP_SET_VAR:
+            try:
+                self.increment = parse_increment(self.value)
+            except ValueError:
+                self.error = f"geçersiz artırma değeri: {self.value}"
+        self.cmp_equal = raw.get("cmp", "==") == "=="
+        self.next_ok = parse_jump(raw.get("next_ok"))
+        self.next_fail = parse_jump(raw.get("next_fail"))
+        # OP_WAIT_ANY: her görselin kendi dal hedefi (boşsa next_ok)
+        branches = raw.get("images") or []
+        self.branch_images = tuple(b.get("image") or "" for b in branches)
+        self.branch_targets = tuple(parse_jump(b.get("next")) for b in branches)
+        self.pick = raw.get("pick") or "first"
+        # Adımın renk modu; boşsa botun varsayılanı (o da boşsa rgb)
+        self.color_mode = raw.get("color_mode") or color_mode or "rgb"
+        # Çok ölçekli arama: adımın ölçekleri, yoksa botun varsayılanı (None → yalnızca 1.0)
+        self.scales = parse_scales(raw.get("scales")) or parse_scales(scales)
+
+
+class Program:
+    __slots__ = ("functions",)
+
+    def __init__(self, functions: dict[str, tuple[Step, ...]]) -> None:
+        self.functions = functions
+
+
+def compile_function(steps: list[dict], color_mode: str | None = None, scales=None) -> tuple[Step, ...]:
+    # "origin": iyileştirilmiş programda adımın özgün numarası (durum mesajları ve izler için)
+    return tuple(Step(raw.get("origin") or number, raw, color_mode, scales) for number, raw in enumerate(steps, start=1))
+
+
+def compile_program(functions: dict[str, list[dict]], color_mode: str | None = None, scales=None) -> Program:
+    # color_mode / scales: botun varsayılan renk modu ve ölçekleri (adımda belirtilmemişse)
+    return Program({name: compile_function(steps, color_mode, scales) for name, steps in functions.items()})
+
+
+def collect_reachable_images(functions: dict[str, list[dict]], start_func: str) -> list[str]:
+    # Başlangıç fonksiyonundan (Fonksiyon Çağır dahil) ulaşılabilen tüm görseller
+    images: list[str] = []
+    seen: set[str] = set()
+    pending = [start_func]
+    while pending:
+        name = pending.pop()
+        if name in seen or name not in functions:
+            continue
+        seen.add(name)
+        for step in functions[name]:
+            op = step.get("op")
+            if op in IMAGE_OPS and step.get("image"):
+                images.append(step["image"])
+            elif op == OP_WAIT_ANY:
+                images.extend(b["image"] for b in step.get("images") or [] if b.get("image"))
+            elif op == OP_CALL and step.get("call_func"):
+                pending.append(step["call_func"])
+    return list(dict.fromkeys(images))
+
+
+def load_bot(path: str, extract_to: str | None = None) -> dict:
+    """save_bot JSON dosyasını ya da .botz paketini okur. Göreli görsel yolları dosyanın klasörüne göre
+    çözülür; paket şablonları template_cache'e kaydedilir (extract_to verilirse o klasöre çıkarılır)."""
+    if os.path.splitext(path)[1].lower() == ".botz":
+        from bundle import load_bundle
+
+        return load_bundle(path, extract_to)
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    functions = data.get("functions")
+    if not isinstance(functions, dict):
+        raise ValueError(f"Geçersiz bot dosyası (functions yok): {path}")
+    base_dir = os.path.dirname(os.path.abspath(path))
+
+    def resolve(image: str) -> str:
+        return image if not image or os.path.isabs(image) else os.path.join(base_dir, image)
+
+    for steps in functions.values():
+        for step in steps or []:
+            if step.get("image"):
+                step["image"] = resolve(step["image"])
+            for branch in step.get("images") or []:
+                branch["image"] = resolve(branch.get("image") or "")
+    return data
+
+
+class ExecutionContext:
+    """Bir çalıştırmanın durumu: derlenmiş program, değişkenler ve durum bildirimi."""
+
+    def __init__(self, program: Program, variables: dict | None = None, status=None) -> None:
+        self.program = program
+        self.variables = {} if variables is None else variables
+        self.status = status or (lambda _text: None)
+        # Handler'ın belirlediği dinamik atlama hedefi (ör. OP_WAIT_ANY dalları)
+        self.jump: int | None = None
+        # (adım numarası, WaitStats) — son bekleme adımları için
+        self.wait_stats: deque[tuple[int, WaitStats]] = deque(maxlen=1000)
+
+    def new_wait_stats(self, step: "Step") -> WaitStats:
+        stats = WaitStats()
+        self.wait_stats.append((step.number, stats))
+        return stats
+
+    def run(self, func_name: str) -> None:
+        # Üst seviye: hatalar çağırana iletilir
+        run_steps(self, self.program.functions[func_name])
+
+    def call(self, func_name: str | None) -> bool:
+        # Alt fonksiyon: bilinmiyorsa ya da hata olursa False, bitince True
+        steps = self.program.functions.get(func_name) if func_name else None
+        if steps is None:
+            return False
+        try:
+            with tracer.span(func_name, CALL):
+                run_steps(self, steps)
+            return True
+        except Exception:
+            return False
+
+
+def run_steps(ctx: ExecutionContext, steps: tuple[Step, ...]) -> None:
+    idx = 0
+    count = len(steps)
+    while 0 <= idx < count:
+        step = steps[idx]
+        if tracer.enabled:
+            with tracer.span(step.op, STEP, {"step": step.number, "image": step.label}) as span:
+                ok = step.handler(ctx, step)
+                span.args["ok"] = ok
+        else:
+            ok = step.handler(ctx, step)
+        target = step.next_ok if ok else step.next_fail
+        if ctx.jump is not None:
+            target, ctx.jump = ctx.jump, None
+        idx = idx + 1 if target is None else target
+
+
+@register_op(OP_CLICK)
+def _op_click(ctx: ExecutionContext, step: Step) -> bool:
+    ctx.status(f"[{step.number}] Resme tıkla: {step.label}")
+    return click_image(step.image, move_duration=step.move_sec, confidence=step.confidence, region=step.region, color_mode=step.color_mode, scales=step.scales)
+
+
+@register_op(OP_WAIT_DISAPPEAR)
+def _op_wait_disappear(ctx: ExecutionContext, step: Step) -> bool:
+    ctx.status(f"[{step.number}] Kaybolmasını bekle: {step.label}")
+    return wait_for_disappear(
+        step.image,
+        timeout_sec=step.timeout_sec,
+        poll_sec=step.poll_sec,
+        confidence=step.confidence,
+        region=step.region,
+        poll_mode=step.poll_mode,
+        stats=ctx.new_wait_stats(step),
+        color_mode=step.color_mode,
+        scales=step.scales,
+    )
+
+
+@register_op(OP_WAIT_APPEAR)
+def _op_wait_appear(ctx: ExecutionContext, step: Step) -> bool:
+    ctx.status(f"[{step.number}] Görünmesini bekle: {step.label}")
+    return wait_for_appear(
+        step.image,
+        timeout_sec=step.timeout_sec,
+        poll_sec=step.poll_sec,
+        confidence=step.confidence,
+        region=step.region,
+        poll_mode=step.poll_mode,
+        stats=ctx.new_wait_stats(step),
+        color_mode=step.color_mode,
+        scales=step.scales,
+    )
+
+
+@register_op(OP_WAIT_ANY)
+def _op_wait_any(ctx: ExecutionContext, step: Step) -> bool:
+    ctx.status(f"[{step.number}] Birini bekle: {', '.join(os.path.basename(p) for p in step.branch_images)}")
+    index = wait_for_any(
+        list(step.branch_images),
+        timeout_sec=step.timeout_sec,
+        poll_sec=step.poll_sec,
+        confidence=step.confidence,
+        region=step.region,
+        poll_mode=step.poll_mode,
+        pick=step.pick,
+        stats=ctx.new_wait_stats(step),
+        color_mode=step.color_mode,
+        scales=step.scales,
+    )
+    if index is None:
+        return False
+    ctx.jump = step.branch_targets[index]
+    return True
+
+
+@register_op(OP_CALL)
+def _op_call(ctx: ExecutionContext, step: Step) -> bool:
+    ctx.status(f"[{step.number}] Fonksiyon çağır: {step.call_func}")
+    return ctx.call(step.call_func)
+
+
+@register_op(OP_SET_VAR)
+def _op_set_var(ctx: ExecutionContext, step: Step) -> bool:
+    name = step.var_name
+    if not name:
+        return False
+    if step.error:
+        ctx.status(f"[{step.number}] Değişken ata: {step.error}")
+        return False
+    if step.increment is not None:
+        ctx.variables[name] += step.increment
+        ctx.status(f"Değişken ata: {name} += {step.increment}")
+    else:
+        ctx.variables[name] = step.value
+        ctx.status(f"Değişken ata: {name} = {step.value}")
+    return True
+
+
+@register_op(OP_IF)
+def _op_if(ctx: ExecutionContext, step: Step) -> bool:
+    left = ctx.variables.get(step.var_name)
+    result = (left == step.value) if step.cmp_equal else (left != step.value)
+    ctx.status(f"Eğer: {step.var_name} {'==' if step.cmp_equal else '!='} {step.value} → {result}")
+    return result
+
+
+def _op_unknown(ctx: ExecutionContext, step: Step) -> bool:
+    ctx.status(f"[{step.number}] Bilinmeyen işlem: {step.op}")
+    return False
@@ -0,0 +1,351 @@
+import os
+import threading
+import time
+import zlib
+from collections import deque
+from dataclasses import dataclass, field
+
+from PIL import Image
+
+from tracing import CAPTURE, tracer
+
+# Bu piksel sayısına kadar olan alanların imzası tüm piksellerden hesaplanır
+SIGNATURE_FULL_PIXELS = 256 * 256
+
+
+@dataclass
+class Frame:
+    image: Image.Image
+    timestamp: float
+    # Karenin sanal masaüstündeki sol-üst köşesi
+    left: int = 0
+    top: int = 0
+    # Tüm ekranı mı, yoksa yalnızca bir bölgeyi mi içeriyor
+    full: bool = True
+    # Yakalama sıra numarası (FrameProvider verir; kırpılan kareler kaynağınınkini taşır, 0 = bilinmiyor)
+    seq: int = 0
+    # Kareden türetilen, kare başına bir kez hesaplanan veriler (ör. renk moduna çevrilmiş diziler)
+    derived: dict = field(default_factory=dict, repr=False, compare=False)
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.timestamp
+
+
+def frame_covers(frame: Frame, region) -> bool:
+    left, top, width, height = region
+    return (
+        frame.left <= left
+        and frame.top <= top
+        and left + width <= frame.left + frame.image.width
+        and top + height <= frame.top + frame.image.height
+    )
+
+
+def crop_frame(frame: Frame, region) -> Frame:
+    left, top, width, height = (int(v) for v in region)
+    x, y = left - frame.left, top - frame.top
+    return Frame(frame.image.crop((x, y, x + width, y + height)), frame.timestamp, left, top, full=False, seq=frame.seq)
+
+
+def frame_signature(frame: Frame) -> int:
+    # Karedeki piksellerin ucuz özeti (CRC32); aynı pikseller → aynı değer. Büyük alanlarda 8x8
+    # blok ortalamaları özetlenir (4K karede ~25 MB yerine ~400 KB); küçük alanlar olduğu gibi.
+    image = frame.image
+    if image.width * image.height > SIGNATURE_FULL_PIXELS:
+        image = image.reduce(8)
+    return zlib.crc32(image.tobytes())
+
+
+class FrameSource:
+    """Kare kaynağı arayüzü: tüm ekranı ya da yalnızca bir bölgeyi PIL görüntüsü olarak verir."""
+
+    name = ""
+
+    def available(self) -> bool:
+        return True
+
+    def bounds(self) -> tuple[int, int, int, int]:
+        # Tam yakalamanın sanal masaüstündeki [left, top, width, height] değeri
+        raise NotImplementedError
+
+    def grab(self, region=None) -> Image.Image:
+        raise NotImplementedError
+
+
+class PyAutoGUISource(FrameSource):
+    name = "pyautogui"
+
+    def available(self) -> bool:
+        try:
+            import pyautogui  # noqa: F401
+            return True
+        except Exception:
+            return False
+
+    def bounds(self) -> tuple[int, int, int, int]:
+        import pyautogui
+
+        width, height = pyautogui.size()
+        return 0, 0, width, height
+
+    def grab(self, region=None) -> Image.Image:
+        import pyautogui
+
+        if region is None:
+            return pyautogui.screenshot()
+        return pyautogui.screenshot(region=tuple(int(v) for v in region))
+
+
+class MSSSource(FrameSource):
+    """mss ile hızlı yakalama (X11'de XShm/XGetImage, Windows'ta BitBlt); bölge yakalamada yalnızca o alan okunur."""
+
+    name = "mss"
+
+    def __init__(self) -> None:
+        # mss örnekleri iş parçacıkları arasında paylaşılamaz
+        self._local = threading.local()
+
+    def available(self) -> bool:
+        try:
+            import mss  # noqa: F401
+            return True
+        except Exception:
+            return False
+
+    def _sct(self):
+        sct = getattr(self._local, "sct", None)
+        if sct is None:
+            import mss
+
+            sct = self._local.sct = mss.mss()
+        return sct
+
+    def bounds(self) -> tuple[int, int, int, int]:
+        mon = self._sct().monitors[0]
+        return mon["left"], mon["top"], mon["width"], mon["height"]
+
+    def grab(self, region=None) -> Image.Image:
+        sct = self._sct()
+        if region is None:
+            monitor = sct.monitors[0]
+        else:
+            left, top, width, height = (int(v) for v in region)
+            monitor = {"left": left, "top": top, "width": width, "height": height}
+        shot = sct.grab(monitor)
+        return Image.frombytes("RGB", shot.size, shot.bgra, "raw", "BGRX")
+
+
+class ReplaySource(FrameSource):
+    """Bir PNG dosyasını ya da klasördeki PNG'leri (ada göre sıralı) ekranmış gibi sunar.
+    interval > 0 ise kareler bu aralıkla, 0 ise her tam yakalamada ilerler."""
+
+    name = "replay"
+
+    def __init__(self, path: str, interval: float = 1.0, loop: bool = True) -> None:
+        if os.path.isdir(path):
+            files = sorted(f for f in os.listdir(path) if f.lower().endswith(".png"))
+            self.paths = [os.path.join(path, f) for f in files]
+        else:
+            self.paths = [path]
+        if not self.paths:
+            raise FileNotFoundError(f"Tekrar oynatılacak PNG bulunamadı: {path}")
+        self.interval = interval
+        self.loop = loop
+        self._images: dict[int, Image.Image] = {}
+        self._started = time.monotonic()
+        self._grabs = 0
+        self._lock = threading.Lock()
+
+    def _index(self) -> int:
+        if self.interval > 0:
+            pos = int((time.monotonic() - self._started) / self.interval)
+        else:
+            pos = self._grabs
+        if self.loop:
+            return pos % len(self.paths)
+        return min(pos, len(self.paths) - 1)
+
+    def _image(self, index: int) -> Image.Image:
+        with self._lock:
+            image = self._images.get(index)
+            if image is None:
+                with Image.open(self.paths[index]) as img:
+                    image = self._images[index] = img.convert("RGB")
+            return image
+
+    def bounds(self) -> tuple[int, int, int, int]:
+        width, height = self._image(self._index()).size
+        return 0, 0, width, height
+
+    def grab(self, region=None) -> Image.Image:
+        image = self._image(self._index())
+        if region is None:
+            if self.interval <= 0:
+                self._grabs += 1
+            return image.copy()
+        left, top, width, height = (int(v) for v in region)
+        return image.crop((left, top, left + width, top + height))
+
+
+def make_source(spec: str | None = None) -> FrameSource:
+    """'pyautogui', 'mss', 'replay:<dosya|klasör>' ya da None/'auto' (mss varsa mss)."""
+    if spec and spec.startswith("replay:"):
+        return ReplaySource(spec[len("replay:"):])
+    if spec in (None, "", "auto"):
+        mss_source = MSSSource()
+        return mss_source if mss_source.available() else PyAutoGUISource()
+    sources = {"pyautogui": PyAutoGUISource, "mss": MSSSource}
+    if spec not in sources:
+        raise ValueError(f"Bilinmeyen yakalama kaynağı: {spec} (seçenekler: auto, pyautogui, mss, replay:<yol>)")
+    source = sources[spec]()
+    if not source.available():
+        raise ValueError(f"Yakalama kaynağı kullanılamıyor: {spec}")
+    return source
+
+
+class FrameProvider:
+    """Ekran görüntüsünü paylaşır: max_age'den genç bir kare varsa yeniden yakalanmaz."""
+
+    def __init__(self, max_age: float = 0.2, source: FrameSource | None = None) -> None:
+        self.max_age = max_age
+        self._source = source
+        # Son invalidate() anı; bundan önce yakalanmış kareler bayat sayılır
+        self.invalidated_at = 0.0
+        self._frame: Frame | None = None
+        self._lock = threading.Lock()
+        self.captures = 0
+
+    def get_frame(self, max_age: float | None = None, region: list[int] | tuple[int, ...] | None = None) -> Frame:
+        limit = self.max_age if max_age is None else max_age
+        with self._lock:
+            frame = self._frame
+        if frame is not None and frame.age <= limit:
+            if region is None:
+                if frame.full:
+                    return frame
+            elif frame_covers(frame, region):
+                return crop_frame(frame, region)
+        return self.capture(region)
+
+    def peek(self, max_age: float | None = None, region=None) -> Frame | None:
+        # get_frame'in yakalama yapmadan döndüreceği kare (kırpılmamış hali); yoksa None
+        limit = self.max_age if max_age is None else max_age
+        with self._lock:
+            frame = self._frame
+        if frame is None or frame.age > limit:
+            return None
+        if region is None:
+            return frame if frame.full else None
+        return frame if frame_covers(frame, region) else None
+
+    @property
+    def source(self) -> FrameSource:
+        if self._source is None:
+            self._source = make_source()
+        return self._source
+
+    def set_source(self, source: FrameSource | str | None) -> FrameSource:
+        self._source = source if isinstance(source, FrameSource) else make_source(source)
+        self.invalidate()
+        return self._source
+
+    def capture(self, region: list[int] | tuple[int, ...] | None = None) -> Frame:
+        # Bölge verilirse yalnızca o dikdörtgen yakalanır
+        source = self.source
+        with tracer.span("grab", CAPTURE, {"source": source.name, "region": region is not None}):
+            if region is None:
+                left, top, _w, _h = source.bounds()
+                image = source.grab()
+                frame = Frame(image, time.monotonic(), left, top)
+            else:
+                left, top, width, height = (int(v) for v in region)
+                image = source.grab((left, top, width, height))
+                frame = Frame(image, time.monotonic(), left, top, full=False)
+        with self._lock:
+            self.captures += 1
+            frame.seq = self.captures
+            self._frame = frame
+        return frame
+
+    def invalidate(self) -> None:
+        # Tıklama vb. ekranı değiştirdiğinde eski kare kullanılmamalı
+        with self._lock:
+            self._frame = None
+            self.invalidated_at = time.monotonic()
+
+
+frame_provider = FrameProvider()
+
+
+class BackgroundCapturer:
+    """Arka planda hedef FPS ile kare yakalar ve küçük bir halka tamponda tutar.
+    Bekleyenler yeni kare gelir gelmez uyanır; birden çok bekleyen aynı kareleri paylaşır."""
+
+    def __init__(self, provider: FrameProvider, fps: float = 10.0, buffer_size: int = 4) -> None:
+        self.provider = provider
+        self.fps = fps
+        self._ring: deque[tuple[int, Frame]] = deque(maxlen=buffer_size)
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self.errors = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and not self._stop.is_set()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        with self._cond:
+            # Önceki çalıştırmadan kalan kareler bayattır
+            self._ring.clear()
+        self._thread = threading.Thread(target=self._run, name="background-capturer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                frame = self.provider.capture()
+            except Exception:
+                self.errors += 1
+                frame = None
+            if frame is not None:
+                with self._cond:
+                    self._seq += 1
+                    self._ring.append((self._seq, frame))
+                    self._cond.notify_all()
+            interval = 1.0 / max(self.fps, 0.1)
+            self._stop.wait(max(0.0, interval - (time.monotonic() - started)))
+
+    def latest(self) -> tuple[int, Frame] | None:
+        with self._cond:
+            return self._ring[-1] if self._ring else None
+
+    def frames(self) -> list[tuple[int, Frame]]:
+        with self._cond:
+            return list(self._ring)
+
+    def wait_next(self, after_seq: int, timeout: float) -> tuple[int, Frame] | None:
+        # after_seq'ten yeni bir kare gelene kadar bekle (zaman aşımı ya da durdurulunca None)
+        with self._cond:
+            def ready() -> bool:
+                return bool(self._ring) and self._ring[-1][0] > after_seq
+
+            self._cond.wait_for(lambda: ready() or self._stop.is_set(), timeout=max(0.0, timeout))
+            return self._ring[-1] if ready() else None
+
+
+background_capturer = BackgroundCapturer(frame_provider)
@@ -0,0 +1,212 @@
+"""Şablon klasörü dizini: dosya adları, boyutları, içerik özetleri ve hazır küçük resimler klasörde
+(.library.json ve .thumbs/) saklanır. Liste ve önizlemeler her seferinde klasör taranmadan ya da
+görsel yeniden örneklenmeden verilir; aynı içerikli şablonlar özetten bulunur.
+
+Değişiklikler watchdog kuruluysa dosya sistemi bildirimleriyle, değilse en fazla scan_interval
+saniyede bir ucuz bir mtime/boyut taramasıyla alınır; yalnızca değişen dosyalar yeniden okunur.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+
+from PIL import Image
+
+IMAGE_EXTS = (".png", ".jpg", ".jpeg")
+INDEX_NAME = ".library.json"
+THUMBS_DIR = ".thumbs"
+THUMB_SIZE = (280, 280)
+# Bellekte tutulan küçük resim sayısı (diskteki önbellek sınırsız)
+THUMB_MEMORY = 256
+INDEX_VERSION = 1
+
+
+@dataclass
+class ImageInfo:
+    name: str
+    mtime_ns: int
+    file_size: int
+    width: int
+    height: int
+    sha256: str
+
+
+def _read_info(path: str, name: str, st: os.stat_result) -> ImageInfo:
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    # Yalnızca başlık okunur; piksel verisi çözülmez
+    with Image.open(path) as img:
+        width, height = img.size
+    return ImageInfo(name, st.st_mtime_ns, st.st_size, width, height, digest)
+
+
+class ImageLibrary:
+    def __init__(self, directory: str, scan_interval: float = 2.0) -> None:
+        self.directory = os.path.abspath(directory)
+        self.scan_interval = scan_interval
+        self._infos: dict[str, ImageInfo] = {}
+        self._names: list[str] = []
+        self._by_hash: dict[str, list[str]] = {}
+        self._thumbs: OrderedDict[str, Image.Image] = OrderedDict()
+        self._scanned_at: float | None = None
+        self._lock = threading.Lock()
+        # watchdog gözlemcisi ve "klasör değişti" işareti (bildirim iş parçacığından atanır)
+        self._observer = None
+        self._dirty = True
+        self._load_index()
+
+    # --- Dizin dosyası ---
+    def _index_path(self) -> str:
+        return os.path.join(self.directory, INDEX_NAME)
+
+    def _load_index(self) -> None:
+        try:
+            with open(self._index_path(), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                self._infos = {e["name"]: ImageInfo(**e) for e in data.get("images", [])}
+        except (OSError, ValueError, TypeError, KeyError):
+            self._infos = {}
+        self._rebuild()
+
+    def _save_index(self) -> None:
+        tmp = self._index_path() + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"version": INDEX_VERSION, "images": [asdict(i) for i in self._infos.values()]}, f, ensure_ascii=False)
+            os.replace(tmp, self._index_path())
+        except OSError:
+            pass
+
+    def _rebuild(self) -> None:
+        self._names = sorted(self._infos)
+        by_hash: dict[str, list[str]] = {}
+        for name in self._names:
+            by_hash.setdefault(self._infos[name].sha256, []).append(name)
+        self._by_hash = by_hash
+
+    # --- Tarama ---
+    def scan(self, force: bool = False) -> bool:
+        """Klasörü dizinle karşılaştırır; değişiklik varsa True. Gözlemci açıkken yalnızca bildirim
+        gelmişse, kapalıyken en fazla scan_interval saniyede bir taranır (force ile her zaman)."""
+        now = time.monotonic()
+        with self._lock:
+            if not force:
+                if self._observer is not None and not self._dirty:
+                    return False
+                if self._observer is None and self._scanned_at is not None and now - self._scanned_at < self.scan_interval:
+                    return False
+            self._dirty = False
+            self._scanned_at = now
+            seen: dict[str, ImageInfo] = {}
+            changed = False
+            try:
+                entries = list(os.scandir(self.directory))
+            except FileNotFoundError:
+                entries = []
+            for entry in entries:
+                if not entry.name.lower().endswith(IMAGE_EXTS) or not entry.is_file():
+                    continue
+                st = entry.stat()
+                info = self._infos.get(entry.name)
+                if info is None or info.mtime_ns != st.st_mtime_ns or info.file_size != st.st_size:
+                    try:
+                        info = _read_info(entry.path, entry.name, st)
+                    except (OSError, ValueError):
+                        # Yazılmakta olan ya da bozuk dosya; sonraki taramada yeniden denenir
+                        continue
+                    changed = True
+                seen[entry.name] = info
+            changed |= seen.keys() != self._infos.keys()
+            if changed:
+                self._infos = seen
+                self._rebuild()
+                self._save_index()
+            return changed
+
+    def watch(self) -> bool:
+        """watchdog kuruluysa klasörü bildirimlerle izler; değilse False (zaman aralıklı tarama sürer)."""
+        if self._observer is not None:
+            return True
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except Exception:
+            return False
+        library = self
+
+        class _Handler(FileSystemEventHandler):
+            def on_any_event(self, event) -> None:
+                library._dirty = True
+
+        observer = Observer()
+        observer.schedule(_Handler(), self.directory, recursive=False)
+        observer.daemon = True
+        observer.start()
+        self._observer = observer
+        self._dirty = True
+        return True
+
+    def stop(self) -> None:
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+
+    # --- Sorgular ---
+    def names(self) -> list[str]:
+        self.scan()
+        return list(self._names)
+
+    def info(self, name: str) -> ImageInfo | None:
+        self.scan()
+        return self._infos.get(os.path.basename(name))
+
+    def duplicates(self) -> dict[str, list[str]]:
+        # içerik özeti → aynı içerikli dosya adları (iki ve daha fazla olanlar)
+        self.scan()
+        return {digest: names for digest, names in self._by_hash.items() if len(names) > 1}
+
+    def duplicates_of(self, name: str) -> list[str]:
+        info = self.info(name)
+        if info is None:
+            return []
+        return [n for n in self._by_hash.get(info.sha256, []) if n != info.name]
+
+    def thumbnail(self, image_path: str) -> Image.Image:
+        """Önizleme boyutunda küçük resim. Klasördeki görseller için içerik özetine göre diskte
+        (ve bellekte) saklanır; klasör dışı dosyalar her seferinde küçültülür."""
+        path = os.path.abspath(image_path)
+        info = self.info(path) if os.path.dirname(path) == self.directory else None
+        if info is None:
+            return _make_thumbnail(path)
+        thumb = self._thumbs.get(info.sha256)
+        if thumb is not None:
+            self._thumbs.move_to_end(info.sha256)
+            return thumb
+        thumb_path = os.path.join(self.directory, THUMBS_DIR, f"{info.sha256}.png")
+        try:
+            with Image.open(thumb_path) as img:
+                img.load()
+                thumb = img.copy()
+        except (OSError, ValueError):
+            thumb = _make_thumbnail(path)
+            try:
+                os.makedirs(os.path.dirname(thumb_path), exist_ok=True)
+                thumb.save(thumb_path)
+            except OSError:
+                pass
+        self._thumbs[info.sha256] = thumb
+        while len(self._thumbs) > THUMB_MEMORY:
+            self._thumbs.popitem(last=False)
+        return thumb
+
+
+def _make_thumbnail(path: str) -> Image.Image:
+    with Image.open(path) as img:
+        img = img.copy()
+    img.thumbnail(THUMB_SIZE, Image.LANCZOS)
+    return img
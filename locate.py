@@ -0,0 +1,596 @@
+import asyncio
+import json
+import math
+import os
+import socket
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+
+from PIL import Image
+
+import matchers
+from frames import Frame, background_capturer, crop_frame, frame_covers, frame_provider, frame_signature
+from templates import template_cache
+from tracing import INPUT, MATCH, tracer
+
+
+class LocateHints:
+    """Her şablonun son bulunduğu kutuyu hatırlar; arama önce bu kutunun çevresinde yapılır."""
+
+    def __init__(self, padding: int = 32) -> None:
+        self.padding = padding
+        self._boxes: dict[str, tuple[int, int, int, int]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def window(self, image_path: str, region=None) -> tuple[int, int, int, int] | None:
+        with self._lock:
+            box = self._boxes.get(image_path)
+        if box is None:
+            return None
+        left, top, width, height = box
+        x1, y1 = left - self.padding, top - self.padding
+        x2, y2 = left + width + self.padding, top + height + self.padding
+        # Pencereyi arama bölgesine (yoksa ekrana) kırp
+        if region:
+            bx, by, bw, bh = region
+        else:
+            bx, by, bw, bh = frame_provider.source.bounds()
+        x1, y1 = max(x1, bx), max(y1, by)
+        x2, y2 = min(x2, bx + bw), min(y2, by + bh)
+        if x2 - x1 < width or y2 - y1 < height:
+            return None
+        return x1, y1, x2 - x1, y2 - y1
+
+    def remember(self, image_path: str, box) -> None:
+        with self._lock:
+            self._boxes[image_path] = (int(box.left), int(box.top), int(box.width), int(box.height))
+
+    def forget(self, image_path: str) -> None:
+        with self._lock:
+            self._boxes.pop(image_path, None)
+
+    def record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        rate = (100.0 * self.hits / total) if total else 0.0
+        return f"ipucu isabet {self.hits}/{total} (%{rate:.0f})"
+
+
+locate_hints = LocateHints()
+
+
+class MatchCache:
+    """Aynı karede aynı şablonun tekrar aranmasını önler: (kare, şablon, bölge, eşik, eşleyici) → sonuç.
+    Yalnızca en son karenin sonuçları tutulur; daha yeni bir kare gelince önbellek boşaltılır."""
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self._seq = 0
+        self._results: dict[tuple, object] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, seq: int, key: tuple):
+        # (bulundu mu, sonuç); sıra numarası olmayan (dışarıdan verilen) kareler önbelleğe alınmaz
+        with self._lock:
+            if seq and seq == self._seq and key in self._results:
+                self.hits += 1
+                return True, self._results[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, seq: int, key: tuple, box) -> None:
+        if not seq:
+            return
+        with self._lock:
+            if seq != self._seq:
+                if seq < self._seq:
+                    # Daha eski bir kare (ör. gecikmiş arka plan karesi); güncel sonuçları ezme
+                    return
+                self._seq = seq
+                self._results.clear()
+            if len(self._results) < self.max_entries:
+                self._results[key] = box
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        rate = (100.0 * self.hits / total) if total else 0.0
+        return f"eşleme önbelleği {self.hits}/{total} (%{rate:.0f})"
+
+
+match_cache = MatchCache()
+
+
+class ScaleMemory:
+    """Çok ölçekli aramada her şablonun bu makinede eşleştiği ölçeği ve makinenin son kazanan ölçeğini
+    hatırlar; sonraki aramalar en olası ölçekten başlar. Makine adına göre bir JSON dosyasında saklanır."""
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path or os.environ.get("MACRO_SCALE_FILE") or os.path.join(os.path.expanduser("~"), ".image_macro_scales.json")
+        self.host = socket.gethostname()
+        self._data: dict | None = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def _entry(self) -> dict:
+        # Çağıran kilidi tutar
+        if self._data is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._data = json.load(f)
+            except (OSError, ValueError):
+                self._data = {}
+        return self._data.setdefault(self.host, {})
+
+    def order(self, image_path: str, scales) -> list[float]:
+        with self._lock:
+            entry = self._entry()
+            known = entry.get(os.path.abspath(image_path))
+            host_scale = entry.get("*", 1.0)
+        # Şablonun bilinen ölçeği önce, sonra makinenin ölçeğine yakınlığa göre
+        ordered = sorted(scales, key=lambda s: abs(math.log(s / host_scale)))
+        if known in ordered:
+            ordered.remove(known)
+            ordered.insert(0, known)
+        return ordered
+
+    def remember(self, image_path: str, scale: float) -> None:
+        key = os.path.abspath(image_path)
+        with self._lock:
+            entry = self._entry()
+            if entry.get(key) != scale or entry.get("*") != scale:
+                entry[key] = scale
+                entry["*"] = scale
+                self._dirty = True
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty or self._data is None:
+                return
+            # Süreç başına ayrı geçici dosya: aynı anda çalışan işler birbirinin dosyasını ezmesin
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(self._data, f, ensure_ascii=False, indent=2)
+                os.replace(tmp, self.path)
+            except BaseException:
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass
+                raise
+            self._dirty = False
+
+
+scale_memory = ScaleMemory()
+
+
+def _needle(image_path: str, mode: str, scale: float = 1.0):
+    # Ölçeklenmiş kopyalar şablon başına bir kez üretilir (template_cache dosya değişince yeniler)
+    if scale == 1.0:
+        return template_cache.derived(image_path, ("needle", mode), lambda image: matchers.Needle(image, mode))
+
+    def build(image: Image.Image):
+        size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        return matchers.Needle(image.resize(size, Image.LANCZOS), mode)
+
+    return template_cache.derived(image_path, ("needle", mode, scale), build)
+
+
+def _haystack(frame: Frame, mode: str):
+    # Kare renk moduna kare başına bir kez çevrilir
+    haystack = frame.derived.get(mode)
+    if haystack is None:
+        haystack = frame.derived[mode] = matchers.Haystack(frame.image, mode)
+    return haystack
+
+
+def _locate_on_frame(needle, confidence: float | None, max_age: float | None, region, frame: Frame | None = None, mode: str = "rgb"):
+    # (kutu ya da None, aramada kullanılan kare)
+    if frame is None or (region is not None and not frame_covers(frame, region)):
+        frame = frame_provider.get_frame(max_age, region)
+    elif region is not None:
+        frame = crop_frame(frame, region)
+    with tracer.span("locate", MATCH, {"mode": mode}):
+        box = matchers.get_matcher().locate(_haystack(frame, mode), needle, confidence, mode)
+    if not box:
+        return None, frame
+    return box._replace(left=box.left + frame.left, top=box.top + frame.top), frame
+
+
+def try_locate_on_screen(
+    image_path: str,
+    confidence: float | None = None,
+    max_age: float | None = None,
+    region=None,
+    frame: Frame | None = None,
+    color_mode: str | None = None,
+    scales=None,
+):
+    """Locate a cached, pre-decoded PIL image (also avoids cv2 imread issues with non-ASCII paths)
+    on the shared frame; a frame younger than max_age is reused instead of taking a new screenshot.
+    If region ([left, top, width, height]) is given, only that rectangle is captured and searched.
+    The padded window around the template's last match is tried before the full search area.
+    Matching goes through the selected matchers backend (see matchers.set_matcher).
+    An explicit frame (e.g. from the background capturer) is searched instead of the shared one.
+    Repeating the same lookup on the same frame returns the cached result (see match_cache).
+    color_mode ("rgb", "gray", "r", "g", "b") selects what is compared; the template is prepared once per mode.
+    With scales (e.g. (0.8, 1.0, 1.25)) pre-scaled template variants are tried, the scale that last won
+    on this host first (see scale_memory)."""
+    try:
+        # Aynı karede aynı arama daha önce yapıldıysa sonucu yeniden kullan
+        base = frame if frame is not None else frame_provider.peek(max_age, region)
+        mode = color_mode or "rgb"
+        key = (image_path, tuple(region) if region else None, confidence, mode, tuple(scales or ()), matchers.get_matcher().name)
+        if base is not None:
+            cached, box = match_cache.get(base.seq, key)
+            if cached:
+                return box
+        order = scale_memory.order(image_path, scales) if scales else [1.0]
+        hint = locate_hints.window(image_path, region)
+        if hint is not None:
+            if frame is None:
+                # İpucu penceresi arama alanının karesinden kırpılır: yalnızca pencereyi yakalamak paylaşılan
+                # tam kareyi değiştirir, sonraki aramalar ve tam arama yeniden yakalamak zorunda kalırdı
+                frame = frame_provider.get_frame(max_age, region)
+            # İpucu kutusu en son kazanan ölçeğin boyutundadır; yalnızca o ölçekle denenir
+            box, used = _locate_on_frame(_needle(image_path, mode, order[0]), confidence, max_age, hint, frame, mode)
+            locate_hints.record(bool(box))
+            if box:
+                match_cache.put(used.seq, key, box)
+                return box
+        for scale in order:
+            box, used = _locate_on_frame(_needle(image_path, mode, scale), confidence, max_age, region, frame, mode)
+            if box:
+                if scales:
+                    scale_memory.remember(image_path, scale)
+                # Sonraki ölçekler aynı kareyi kullansın (gerekirse yeniden yakalanmasın)
+                break
+            frame = frame if frame is not None else used
+        if box:
+            locate_hints.remember(image_path, box)
+        else:
+            locate_hints.forget(image_path)
+        match_cache.put(used.seq, key, box)
+        return box
+    except Exception:
+        return None
+
+
+def click_image(
+    image_path: str,
+    move_duration: float = 0.15,
+    confidence: float | None = None,
+    max_age: float | None = None,
+    region=None,
+    color_mode: str | None = None,
+    scales=None,
+) -> bool:
+    box = try_locate_on_screen(image_path, confidence, max_age, region, color_mode=color_mode, scales=scales)
+    if not box:
+        return False
+    # tkinter'a bağımlı olabilen pyautogui yalnızca tıklarken yüklenir (başsız çalıştırıcı için)
+    import pyautogui
+
+    center = pyautogui.center(box)
+    # pyautogui.PAUSE beklemesi de bu span'e dahildir
+    with tracer.span("click", INPUT, {"pause_sec": pyautogui.PAUSE}):
+        pyautogui.click(center.x, center.y)
+    # Tıklama ekranı değiştirir; sonraki arama yeni kare almalı
+    frame_provider.invalidate()
+    with tracer.span("move_sleep", INPUT):
+        time.sleep(move_duration)
+    return True
+
+
+@dataclass
+class WaitStats:
+    polls: int = 0
+    matches: int = 0
+    # Kare değişmediği için atlanan eşlemeler
+    skipped: int = 0
+    capture_sec: float = 0.0
+    # Kare imzası (değişti mi?) hesaplama süresi
+    signature_sec: float = 0.0
+    match_sec: float = 0.0
+    elapsed_sec: float = 0.0
+
+
+class FixedPoll:
+    def __init__(self, interval: float) -> None:
+        self.interval = max(0.0, interval)
+        self.min_interval = self.interval
+
+    def observe(self, changed: bool) -> None:
+        pass
+
+    def next_interval(self, elapsed: float) -> float:
+        return self.interval
+
+
+class AdaptivePoll:
+    """Beklemenin başında ve ekran değişirken hızlı, ekran durağanken üstel olarak yavaşlayan poll aralığı."""
+
+    def __init__(self, min_interval: float = 0.05, max_interval: float = 2.0, factor: float = 2.0, fast_phase_sec: float = 0.5) -> None:
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.factor = factor
+        self.fast_phase_sec = fast_phase_sec
+        self._current = min_interval
+        self._changed = True
+
+    def observe(self, changed: bool) -> None:
+        self._changed = changed
+
+    def next_interval(self, elapsed: float) -> float:
+        if self._changed or elapsed < self.fast_phase_sec:
+            self._current = self.min_interval
+        else:
+            self._current = min(self.max_interval, self._current * self.factor)
+        return self._current
+
+
+def make_poll_policy(poll_sec: float, mode: str | None = None):
+    # "adaptive": poll_sec/5 (en az 50 ms) ile poll_sec*4 arasında; diğer her şey sabit aralık
+    if mode == "adaptive":
+        return AdaptivePoll(min_interval=max(0.05, poll_sec / 5.0), max_interval=max(poll_sec * 4.0, 0.05))
+    return FixedPoll(poll_sec)
+
+
+# Son beklemenin istatistikleri (teşhis için)
+last_wait_stats: WaitStats | None = None
+
+
+def _wait_frames(timeout_sec: float, policy):
+    """Bekleme döngüsü için kareler üretir. Arka plan yakalayıcı çalışıyorsa her yeni kareyi
+    geldiği anda verir; yoksa None verir (çağıran paylaşılan kareyi kullanır) ve poll politikasının
+    aralığı kadar uyur. Son kontrol tam timeout anında yapılır, bir uyku süresi kadar aşılmaz."""
+    started = time.monotonic()
+    deadline = started + timeout_sec
+    seq = -1
+    while True:
+        if background_capturer.running:
+            got = background_capturer.wait_next(seq, deadline - time.monotonic())
+            if got is not None:
+                seq, frame = got
+                # Tıklamadan önce yakalanmış kareler ekranın eski halidir
+                if frame.timestamp >= frame_provider.invalidated_at:
+                    yield frame
+            if time.monotonic() >= deadline:
+                return
+        else:
+            yield None
+            now = time.monotonic()
+            if now >= deadline:
+                return
+            time.sleep(min(policy.next_interval(now - started), deadline - now))
+
+
+class _Watcher:
+    """Bir bekleme döngüsünün kare başına işi (sync ve async döngüler ortak kullanır).
+    Arama alanındaki pikseller bir önceki kareyle aynıysa evaluate çağrılmaz, önceki sonuç kullanılır."""
+
+    def __init__(self, policy, region, evaluate, stats: WaitStats) -> None:
+        self.policy = policy
+        self.region = region
+        self.evaluate = evaluate
+        self.stats = stats
+        self.last_signature = None
+        self.last_result = None
+
+    def feed(self, frame: Frame | None):
+        region = self.region
+        t0 = time.perf_counter()
+        if frame is None or (region is not None and not frame_covers(frame, region)):
+            frame = frame_provider.get_frame(min(self.policy.min_interval, frame_provider.max_age), region)
+        elif region is not None:
+            frame = crop_frame(frame, region)
+        t1 = time.perf_counter()
+        signature = frame_signature(frame)
+        t2 = time.perf_counter()
+        self.stats.polls += 1
+        self.stats.capture_sec += t1 - t0
+        self.stats.signature_sec += t2 - t1
+        changed = signature != self.last_signature
+        self.policy.observe(changed)
+        if changed:
+            self.last_result = self.evaluate(frame)
+            self.last_signature = signature
+            self.stats.matches += 1
+            self.stats.match_sec += time.perf_counter() - t2
+        else:
+            self.stats.skipped += 1
+        return self.last_result
+
+
+def _watch(timeout_sec: float, policy, region, evaluate, stats: WaitStats | None = None):
+    """evaluate(frame) None olmayan bir sonuç verene kadar kareleri izler; zaman aşımında None döner."""
+    global last_wait_stats
+    stats = WaitStats() if stats is None else stats
+    started = time.monotonic()
+    watcher = _Watcher(policy, region, evaluate, stats)
+    try:
+        for frame in _wait_frames(timeout_sec, policy):
+            result = watcher.feed(frame)
+            if result is not None:
+                return result
+        return None
+    finally:
+        stats.elapsed_sec = time.monotonic() - started
+        last_wait_stats = stats
+
+
+async def watch_async(timeout_sec: float, policy, region, evaluate, stats: WaitStats | None = None):
+    """_watch'ın asyncio karşılığı: yakalama ve eşleme iş parçacığı havuzunda yapılır, aralarda
+    olay döngüsü serbest kalır. İptal (CancelledError) bir sonraki await noktasında yayılır."""
+    global last_wait_stats
+    stats = WaitStats() if stats is None else stats
+    started = time.monotonic()
+    deadline = started + timeout_sec
+    watcher = _Watcher(policy, region, evaluate, stats)
+    seq = -1
+    try:
+        while True:
+            frame = None
+            if background_capturer.running:
+                # Arka plan yakalayıcının son karesi; yeni kare yoksa yeniden eşlemeye gerek yok
+                got = background_capturer.latest()
+                if got is not None and got[0] != seq and got[1].timestamp >= frame_provider.invalidated_at:
+                    seq, frame = got
+                    result = await asyncio.to_thread(watcher.feed, frame)
+                else:
+                    result = watcher.last_result
+            else:
+                result = await asyncio.to_thread(watcher.feed, None)
+            if result is not None:
+                return result
+            now = time.monotonic()
+            if now >= deadline:
+                return None
+            interval = policy.next_interval(now - started)
+            if background_capturer.running:
+                interval = min(interval, 1.0 / max(background_capturer.fps, 0.1))
+            await asyncio.sleep(min(interval, deadline - now))
+    finally:
+        stats.elapsed_sec = time.monotonic() - started
+        last_wait_stats = stats
+
+
+def _appear_check(image_path: str, confidence, region, color_mode=None, scales=None):
+    def evaluate(frame):
+        return True if try_locate_on_screen(image_path, confidence, region=region, frame=frame, color_mode=color_mode, scales=scales) else None
+
+    return evaluate
+
+
+def _disappear_check(image_path: str, confidence, region, color_mode=None, scales=None):
+    def evaluate(frame):
+        return None if try_locate_on_screen(image_path, confidence, region=region, frame=frame, color_mode=color_mode, scales=scales) else True
+
+    return evaluate
+
+
+def _any_check(image_paths: list[str], confidence, region, pick: str, color_mode=None, scales=None):
+    def evaluate(frame):
+        best_index, best_score = None, None
+        for index, image_path in enumerate(image_paths):
+            box = try_locate_on_screen(image_path, confidence, region=region, frame=frame, color_mode=color_mode, scales=scales)
+            if not box:
+                continue
+            if pick != "best":
+                return index
+            score = getattr(box, "score", 1.0)
+            if best_score is None or score > best_score:
+                best_index, best_score = index, score
+        return best_index
+
+    return evaluate
+
+
+def wait_for_appear(
+    image_path: str,
+    timeout_sec: float = 30.0,
+    poll_sec: float = 0.5,
+    confidence: float | None = None,
+    region=None,
+    poll_mode: str | None = None,
+    stats: WaitStats | None = None,
+    color_mode: str | None = None,
+    scales=None,
+) -> bool:
+    evaluate = _appear_check(image_path, confidence, region, color_mode, scales)
+    return _watch(timeout_sec, make_poll_policy(poll_sec, poll_mode), region, evaluate, stats) is not None
+
+
+def wait_for_disappear(
+    image_path: str,
+    timeout_sec: float = 30.0,
+    poll_sec: float = 0.5,
+    confidence: float | None = None,
+    region=None,
+    poll_mode: str | None = None,
+    stats: WaitStats | None = None,
+    color_mode: str | None = None,
+    scales=None,
+) -> bool:
+    evaluate = _disappear_check(image_path, confidence, region, color_mode, scales)
+    return _watch(timeout_sec, make_poll_policy(poll_sec, poll_mode), region, evaluate, stats) is not None
+
+
+def wait_for_any(
+    image_paths: list[str],
+    timeout_sec: float = 30.0,
+    poll_sec: float = 0.5,
+    confidence: float | None = None,
+    region=None,
+    poll_mode: str | None = None,
+    pick: str = "first",
+    stats: WaitStats | None = None,
+    color_mode: str | None = None,
+    scales=None,
+) -> int | None:
+    """Tüm şablonları aynı kare üzerinde yarıştırır; eşleşenin indeksini (pick="first": listedeki ilk,
+    "best": en yüksek skor) ya da zaman aşımında None döndürür."""
+    evaluate = _any_check(image_paths, confidence, region, pick, color_mode, scales)
+    return _watch(timeout_sec, make_poll_policy(poll_sec, poll_mode), region, evaluate, stats)
+
+
+async def wait_for_appear_async(
+    image_path: str,
+    timeout_sec: float = 30.0,
+    poll_sec: float = 0.5,
+    confidence: float | None = None,
+    region=None,
+    poll_mode: str | None = None,
+    stats: WaitStats | None = None,
+    color_mode: str | None = None,
+    scales=None,
+) -> bool:
+    evaluate = _appear_check(image_path, confidence, region, color_mode, scales)
+    return await watch_async(timeout_sec, make_poll_policy(poll_sec, poll_mode), region, evaluate, stats) is not None
+
+
+async def wait_for_disappear_async(
+    image_path: str,
+    timeout_sec: float = 30.0,
+    poll_sec: float = 0.5,
+    confidence: float | None = None,
+    region=None,
+    poll_mode: str | None = None,
+    stats: WaitStats | None = None,
+    color_mode: str | None = None,
+    scales=None,
+) -> bool:
+    evaluate = _disappear_check(image_path, confidence, region, color_mode, scales)
+    return await watch_async(timeout_sec, make_poll_policy(poll_sec, poll_mode), region, evaluate, stats) is not None
+
+
+async def wait_for_any_async(
+    image_paths: list[str],
+    timeout_sec: float = 30.0,
+    poll_sec: float = 0.5,
+    confidence: float | None = None,
+    region=None,
+    poll_mode: str | None = None,
+    pick: str = "first",
+    stats: WaitStats | None = None,
+    color_mode: str | None = None,
+    scales=None,
+) -> int | None:
+    evaluate = _any_check(image_paths, confidence, region, pick, color_mode, scales)
+    return await watch_async(timeout_sec, make_poll_policy(poll_sec, poll_mode), region, evaluate, stats)
@@ -1,16 +1,27 @@
 import os
 from re import A
 import threading
-import time
 import json
 import tkinter as tk
+from typing import TYPE_CHECKING
 from tkinter import ttk, messagebox, simpledialog, filedialog
-from PIL import Image, ImageTk
-import pyautogui
-from screenshot import select_region
+from templates import template_cache
+from frames import background_capturer, frame_provider
+from image_library import ImageLibrary
+from locate import locate_hints, match_cache, scale_memory
+from analysis import ERROR, analyze, optimize
+from tracing import env_trace_path, tracer
+from engine import IMAGE_OPS, OP_WAIT_ANY, OPS, ExecutionContext, Program, collect_reachable_images, compile_program, load_bot, parse_scales
+import matchers
+
+if TYPE_CHECKING:
+    from PIL import ImageTk
 
 
 IMAGES_DIR_NAME = "images"
+# Uzun adım listelerinde ilk bu kadar satır hemen, kalanı olay döngüsü arasında parça parça çizilir
+TREE_FIRST_CHUNK = 200
+TREE_CHUNK = 1000
 
 
 def ensure_images_dir() -> str:
@@ -20,6 +31,13 @@ def ensure_images_dir() -> str:
     return images_dir
 
 
+def select_region() -> list[int] | None:
+    # PySide6 yalnızca bölge seçim katmanı ilk açıldığında yüklenir (açılış süresi)
+    from screenshot import select_region as qt_select_region
+
+    return qt_select_region()
+
+
 def capture_region_to_file(filename_stem: str) -> str | None:
     images_dir = ensure_images_dir()
     file_name = filename_stem if filename_stem.lower().endswith(".png") else f"{filename_stem}.png"
@@ -28,54 +46,35 @@ def capture_region_to_file(filename_stem: str) -> str | None:
     region = select_region()
     if not region:
         return None
-    pyautogui.screenshot(region=tuple(region)).save(save_path)
+    frame_provider.source.grab(region).save(save_path)
     return save_path
 
 
-def try_locate_on_screen(image_path: str, confidence: float | None = None):
-    """Locate using a PIL image object to avoid cv2 imread issues with non-ASCII paths."""
-    kwargs = {}
-    if confidence is not None:
-        try:
-            import cv2  # noqa: F401
-            kwargs["confidence"] = confidence
-        except Exception:
-            # confidence param requires OpenCV; if not available, ignore it
-            pass
-    try:
-        with Image.open(image_path) as needle_img:
-            return pyautogui.locateOnScreen(needle_img, **kwargs)
-    except Exception:
-        return None
+def parse_branches(text: str, images_dir: str) -> list[dict]:
+    # "basari.png=5, hata.png=9" → [{"image": <yol>, "next": "5"}, ...]; hedef boşsa next_ok kullanılır
+    branches = []
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, target = part.partition("=")
+        branches.append({"image": os.path.join(images_dir, name.strip()), "next": target.strip() or None})
+    return branches
 
 
-def click_image(image_path: str, move_duration: float = 0.15, confidence: float | None = None) -> bool:
-    box = try_locate_on_screen(image_path, confidence)
-    if not box:
-        return False
-    center = pyautogui.center(box)
-    print(center)
-    pyautogui.click(center.x, center.y)
-    time.sleep(move_duration)
-    return True
+def format_branches(branches) -> str:
+    return ", ".join(f"{os.path.basename(b.get('image') or '')}={b.get('next') or ''}" for b in branches or [])
 
 
-def wait_for_appear(image_path: str, timeout_sec: float = 30.0, poll_sec: float = 0.5, confidence: float | None = None) -> bool:
-    end_time = time.time() + timeout_sec
-    while time.time() < end_time:
-        if try_locate_on_screen(image_path, confidence):
-            return True
-        time.sleep(poll_sec)
-    return False
+def format_scales(scales) -> str:
+    return ", ".join(f"{s:g}" for s in scales or [])
 
 
-def wait_for_disappear(image_path: str, timeout_sec: float = 30.0, poll_sec: float = 0.5, confidence: float | None = None) -> bool:
-    end_time = time.time() + timeout_sec
-    while time.time() < end_time:
-        if not try_locate_on_screen(image_path, confidence):
-            return True
-        time.sleep(poll_sec)
-    return False
+def format_region(region) -> str:
+    if not region:
+        return "Tüm ekran"
+    left, top, width, height = region
+    return f"{width}x{height}@{left},{top}"
 
 
 class ImageRecognitionMacroApp(tk.Tk):
@@ -90,8 +89,17 @@ class ImageRecognitionMacroApp(tk.Tk):
         self.functions: dict[str, list[dict]] = {"Varsayılan": []}
         self.current_func_name: str = "Varsayılan"
         self.steps: list[dict] = self.functions[self.current_func_name]
+        # Değişkenler çalıştırmalar arasında korunur
+        self.variables: dict = {}
+        # Adım tablosu satırları (self.steps ile aynı sırada) ve bekleyen parça çizimi
+        self._row_ids: list[str] = []
+        self._tree_fill_job: str | None = None
+        # ./images dizini: ad listesi, küçük resimler ve içerik özetleri (watchdog varsa bildirimle güncellenir)
+        self.image_library = ImageLibrary(ensure_images_dir())
+        self.image_library.watch()
 
         self._build_ui()
+        self.refresh_images_list()
 
     def _build_ui(self) -> None:
         main = ttk.Frame(self, padding=12)
@@ -145,14 +153,7 @@ class ImageRecognitionMacroApp(tk.Tk):
         self.new_op_combo = ttk.Combobox(
             form,
             textvariable=self.new_op_var,
-            values=[
-                "Resme Tıkla",
-                "Resmin Kaybolmasını Bekle",
-                "Resmin Görünmesini Bekle",
-                "Fonksiyon Çağır",
-                "Değişken Ata",
-                "Eğer",
-            ],
+            values=list(OPS),
             state="readonly",
             width=28,
         )
@@ -162,9 +163,11 @@ class ImageRecognitionMacroApp(tk.Tk):
         self.image_label = ttk.Label(form, text="Görsel:")
         self.image_label.grid(row=0, column=2, sticky=tk.W, padx=(16, 6))
         self.new_image_var = tk.StringVar()
-        self.new_image_combo = ttk.Combobox(form, textvariable=self.new_image_var, width=40)
+        # Liste açılırken dizinden doldurulur (klasör değiştiyse yalnızca değişenler okunur)
+        self.new_image_combo = ttk.Combobox(form, textvariable=self.new_image_var, width=40, postcommand=self.refresh_images_list)
         self.new_image_combo.grid(row=0, column=3, sticky=tk.W)
-        self.image_refresh_btn = ttk.Button(form, text="Yenile", command=self.refresh_images_list)
+        self.new_image_combo.bind("<<ComboboxSelected>>", self.on_image_selected)
+        self.image_refresh_btn = ttk.Button(form, text="Yenile", command=lambda: self.refresh_images_list(force=True))
         self.image_refresh_btn.grid(row=0, column=4, padx=(6, 0))
 
         # Çağrılacak fonksiyon
@@ -227,6 +230,12 @@ class ImageRecognitionMacroApp(tk.Tk):
         self.new_poll_var = tk.StringVar(value="0.5")
         self.poll_entry = ttk.Entry(form, textvariable=self.new_poll_var, width=8)
         self.poll_entry.grid(row=1, column=7, sticky=tk.W, pady=(6, 0))
+        # Poll modu: sabit aralık ya da uyarlamalı (değişimde hızlı, durağan ekranda yavaşlayan)
+        self.poll_mode_label = ttk.Label(form, text="Poll modu:")
+        self.poll_mode_label.grid(row=1, column=8, sticky=tk.W, padx=(16, 6), pady=(6, 0))
+        self.new_poll_mode_var = tk.StringVar(value="fixed")
+        self.poll_mode_combo = ttk.Combobox(form, textvariable=self.new_poll_mode_var, values=["fixed", "adaptive"], state="readonly", width=9)
+        self.poll_mode_combo.grid(row=1, column=9, sticky=tk.W, pady=(6, 0))
 
         # Dallanma: Başarılı / Başarısız sonraki adım (1-based index)
         ttk.Label(form, text="Başarılı→Adım#:").grid(row=2, column=0, sticky=tk.W, padx=(0, 6), pady=(8, 0))
@@ -237,6 +246,43 @@ class ImageRecognitionMacroApp(tk.Tk):
         self.new_next_fail_var = tk.StringVar(value="")
         ttk.Entry(form, textvariable=self.new_next_fail_var, width=8).grid(row=2, column=3, sticky=tk.W, pady=(8, 0))
 
+        # Resimlerden Birini Bekle: görsel=adım dalları ve seçim kuralı
+        self.branches_row = ttk.Frame(form)
+        self.branches_row.grid(row=4, column=0, columnspan=10, sticky=tk.W, pady=(6, 0))
+        ttk.Label(self.branches_row, text="Dallar (görsel=adım, ...):").pack(side=tk.LEFT)
+        self.new_branches_var = tk.StringVar(value="")
+        ttk.Entry(self.branches_row, textvariable=self.new_branches_var, width=60).pack(side=tk.LEFT, padx=(6, 0))
+        ttk.Button(self.branches_row, text="Seçili Görseli Ekle", command=self.on_add_branch_image).pack(side=tk.LEFT, padx=(6, 0))
+        ttk.Label(self.branches_row, text="Seçim:").pack(side=tk.LEFT, padx=(16, 6))
+        self.new_pick_var = tk.StringVar(value="first")
+        ttk.Combobox(self.branches_row, textvariable=self.new_pick_var, values=["first", "best"], state="readonly", width=7).pack(side=tk.LEFT)
+
+        # Arama bölgesi (boşsa tüm ekran)
+        self.new_region: list[int] | None = None
+        self.region_label = ttk.Label(form, text="Arama Bölgesi:")
+        self.region_label.grid(row=2, column=4, sticky=tk.W, padx=(16, 6), pady=(8, 0))
+        self.new_region_var = tk.StringVar(value=format_region(None))
+        self.region_value_label = ttk.Label(form, textvariable=self.new_region_var)
+        self.region_value_label.grid(row=2, column=5, sticky=tk.W, pady=(8, 0))
+        self.region_select_btn = ttk.Button(form, text="Seç", command=self.on_select_search_region)
+        self.region_select_btn.grid(row=2, column=6, sticky=tk.W, padx=(6, 0), pady=(8, 0))
+        self.region_clear_btn = ttk.Button(form, text="Temizle", command=lambda: self._set_new_region(None))
+        self.region_clear_btn.grid(row=2, column=7, sticky=tk.W, padx=(6, 0), pady=(8, 0))
+
+        # Renk modu (boş: botun varsayılanı)
+        self.color_mode_label = ttk.Label(form, text="Renk:")
+        self.color_mode_label.grid(row=2, column=8, sticky=tk.W, padx=(16, 6), pady=(8, 0))
+        self.new_color_mode_var = tk.StringVar(value="")
+        self.color_mode_combo = ttk.Combobox(form, textvariable=self.new_color_mode_var, values=["", *matchers.COLOR_MODES], state="readonly", width=9)
+        self.color_mode_combo.grid(row=2, column=9, sticky=tk.W, pady=(8, 0))
+
+        # Çok ölçekli arama (ör. "0.8, 1, 1.25"; boş: botun varsayılanı)
+        self.scales_label = ttk.Label(form, text="Ölçekler:")
+        self.scales_label.grid(row=2, column=10, sticky=tk.W, padx=(16, 6), pady=(8, 0))
+        self.new_scales_var = tk.StringVar(value="")
+        self.scales_entry = ttk.Entry(form, textvariable=self.new_scales_var, width=12)
+        self.scales_entry.grid(row=2, column=11, sticky=tk.W, pady=(8, 0))
+
         # Adım listeleme
         list_frame = ttk.Frame(steps_frame)
         list_frame.pack(fill=tk.BOTH, expand=True, pady=(8, 4))
@@ -264,6 +310,46 @@ class ImageRecognitionMacroApp(tk.Tk):
         self.new_op_combo.bind("<<ComboboxSelected>>", lambda _e=None: self._update_add_form_visibility())
         self._update_add_form_visibility()
 
+        # Eşleyici arka ucu (yalnızca kullanılabilir olanlar listelenir)
+        matcher_row = ttk.Frame(main)
+        matcher_row.pack(fill=tk.X, pady=(4, 0))
+        ttk.Label(matcher_row, text="Eşleyici:").pack(side=tk.LEFT)
+        self.matcher_var = tk.StringVar(value="auto")
+        # Kullanılabilirlik (numpy/cv2/pyautogui yoklaması) liste ilk açıldığında hesaplanır
+        matcher_combo = ttk.Combobox(
+            matcher_row,
+            textvariable=self.matcher_var,
+            values=["auto"] + list(matchers.MATCHERS),
+            state="readonly",
+            width=12,
+        )
+        matcher_combo.configure(postcommand=lambda: matcher_combo.configure(
+            values=["auto"] + [name for name, cap in matchers.capabilities().items() if cap["available"]]
+        ))
+        matcher_combo.pack(side=tk.LEFT, padx=(6, 0))
+        matcher_combo.bind("<<ComboboxSelected>>", self.on_matcher_selected)
+        ttk.Label(matcher_row, text="Renk modu:").pack(side=tk.LEFT, padx=(16, 0))
+        # Botun varsayılanı; adımda renk seçilmemişse bu kullanılır
+        self.color_mode_var = tk.StringVar(value="rgb")
+        ttk.Combobox(matcher_row, textvariable=self.color_mode_var, values=list(matchers.COLOR_MODES), state="readonly", width=6).pack(side=tk.LEFT, padx=(6, 0))
+        ttk.Label(matcher_row, text="Ölçekler:").pack(side=tk.LEFT, padx=(16, 0))
+        # Botun varsayılan ölçekleri; boşsa yalnızca 1.0 (tek ölçek)
+        self.scales_var = tk.StringVar(value="")
+        ttk.Entry(matcher_row, textvariable=self.scales_var, width=12).pack(side=tk.LEFT, padx=(6, 0))
+        ttk.Label(matcher_row, text="Yakalama:").pack(side=tk.LEFT, padx=(16, 0))
+        self.source_var = tk.StringVar(value="auto")
+        source_combo = ttk.Combobox(matcher_row, textvariable=self.source_var, values=["auto", "mss", "pyautogui"], state="readonly", width=12)
+        source_combo.pack(side=tk.LEFT, padx=(6, 0))
+        source_combo.bind("<<ComboboxSelected>>", self.on_source_selected)
+        # Ölü adımlar, atlama zincirleri ve ard arda aynı beklemeler çalıştırmadan önce sadeleştirilir
+        self.optimize_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(matcher_row, text="İyileştir", variable=self.optimize_var).pack(side=tk.LEFT, padx=(16, 0))
+        self.bg_capture_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(matcher_row, text="Arka plan yakalama", variable=self.bg_capture_var).pack(side=tk.LEFT, padx=(16, 0))
+        ttk.Label(matcher_row, text="FPS:").pack(side=tk.LEFT, padx=(6, 0))
+        self.bg_fps_var = tk.StringVar(value="10")
+        ttk.Entry(matcher_row, textvariable=self.bg_fps_var, width=5).pack(side=tk.LEFT, padx=(6, 0))
+
         # Başlat
         self.start_btn = ttk.Button(main, text="Makroyu Başlat", command=self.on_start_macro)
         self.start_btn.pack(pady=(4, 8))
@@ -272,6 +358,27 @@ class ImageRecognitionMacroApp(tk.Tk):
         self.status_var = tk.StringVar(value="Hazır")
         ttk.Label(main, textvariable=self.status_var).pack(anchor=tk.W)
 
+    def on_matcher_selected(self, _event=None) -> None:
+        try:
+            matchers.set_matcher(self.matcher_var.get())
+            matcher = matchers.get_matcher()
+        except ValueError as e:
+            messagebox.showerror("Eşleyici", str(e))
+            self.matcher_var.set("auto")
+            matchers.set_matcher(None)
+            return
+        conf_text = "confidence destekli" if matcher.supports_confidence() else "yalnızca tam eşleşme"
+        self.set_status(f"Eşleyici: {matcher.name} ({conf_text})")
+
+    def on_source_selected(self, _event=None) -> None:
+        try:
+            source = frame_provider.set_source(self.source_var.get())
+        except ValueError as e:
+            messagebox.showerror("Yakalama", str(e))
+            self.source_var.set("auto")
+            source = frame_provider.set_source(None)
+        self.set_status(f"Yakalama kaynağı: {source.name}")
+
     def set_status(self, text: str) -> None:
         self.status_var.set(text)
         self.update_idletasks()
@@ -326,7 +433,6 @@ class ImageRecognitionMacroApp(tk.Tk):
         self.functions[name] = self.functions.pop(old)
         self.current_func_name = name
         self._refresh_function_combo()
-        self._sync_steps_tree()
 
     def delete_function(self) -> None:
         if len(self.functions) <= 1:
@@ -360,14 +466,44 @@ class ImageRecognitionMacroApp(tk.Tk):
             return
 
         self.selected_image_path = saved_path
+        self.refresh_images_list(force=True)
         self._load_preview(saved_path)
-        self.set_status(f"Kaydedildi: ./{IMAGES_DIR_NAME}/{os.path.basename(saved_path)}")
+        duplicates = self.image_library.duplicates_of(saved_path)
+        if duplicates:
+            self.set_status(f"Kaydedildi: ./{IMAGES_DIR_NAME}/{os.path.basename(saved_path)} (aynı içerik: {', '.join(duplicates)})")
+        else:
+            self.set_status(f"Kaydedildi: ./{IMAGES_DIR_NAME}/{os.path.basename(saved_path)}")
+
+    def on_image_selected(self, _event=None) -> None:
+        name = self.new_image_var.get().strip()
+        if name:
+            self._load_preview(os.path.join(ensure_images_dir(), name))
+
+    def on_add_branch_image(self) -> None:
+        name = self.new_image_var.get().strip()
+        if not name:
+            return
+        current = self.new_branches_var.get().strip()
+        self.new_branches_var.set(f"{current}, {name}=" if current else f"{name}=")
+
+    def _set_new_region(self, region: list[int] | None) -> None:
+        self.new_region = region
+        self.new_region_var.set(format_region(region))
+
+    def on_select_search_region(self) -> None:
+        self.set_status("Arama bölgesini seçin... (ESC iptal)")
+        region = select_region()
+        if not region:
+            self.set_status("İptal edildi.")
+            return
+        self._set_new_region(region)
+        self.set_status(f"Arama bölgesi: {format_region(region)}")
 
     def _load_preview(self, image_path: str) -> None:
         try:
-            with Image.open(image_path) as img:
-                img = img.copy()
-            img.thumbnail((280, 280), Image.LANCZOS)
+            img = self.image_library.thumbnail(image_path)
+            from PIL import ImageTk
+
             self.preview_photo = ImageTk.PhotoImage(img)
             self.preview_label.configure(image=self.preview_photo)
         except Exception as e:
@@ -377,194 +513,72 @@ class ImageRecognitionMacroApp(tk.Tk):
         if not self.steps:
             messagebox.showwarning("Uyarı", "Lütfen en az bir adım ekleyin.")
             return
-        self.set_status("Makro çalışıyor...")
+        if not self._check_program("Çalıştırmaya"):
+            return
+        optimized = optimize(self.functions) if self.optimize_var.get() else None
+        try:
+            program = compile_program(
+                self.functions if optimized is None else optimized.functions, self.color_mode_var.get(), self.scales_var.get()
+            )
+        except Exception as e:
+            messagebox.showerror("Derleme Hatası", f"Adımlar derlenemedi:\n{e}")
+            return
+        # Ulaşılabilen tüm şablonları baştan yükle: eksik görsel çalışma ortasında değil burada yakalanır
+        try:
+            template_cache.preload(collect_reachable_images(self.functions, self.current_func_name))
+        except Exception as e:
+            messagebox.showerror("Şablon Hatası", f"Görseller yüklenemedi:\n{e}")
+            return
+        if self.bg_capture_var.get():
+            try:
+                background_capturer.fps = max(0.1, float(self.bg_fps_var.get() or 10))
+            except ValueError:
+                background_capturer.fps = 10.0
+            background_capturer.start()
+        self.set_status(f"Makro çalışıyor... ({optimized.summary()})" if optimized is not None else "Makro çalışıyor...")
         self._set_buttons_state(disabled=True)
-        threading.Thread(target=self._run_macro_safe, args=(self.steps,), daemon=True).start()
+        threading.Thread(target=self._run_macro_safe, args=(program, self.current_func_name), daemon=True).start()
 
     def _set_buttons_state(self, disabled: bool) -> None:
         state = tk.DISABLED if disabled else tk.NORMAL
         self.select_btn.configure(state=state)
         self.start_btn.configure(state=state)
 
-    def _run_macro(self, steps: list[dict]) -> None:
+    def _run_macro(self, program: Program, func_name: str) -> None:
+        # İz dosyası her çalıştırmada yeniden yazılır; yalnızca bu çalıştırmanın olaylarını içersin
+        tracer.clear()
         try:
-            idx = 1
-            while 1 <= idx <= len(steps):
-                step = steps[idx - 1]
-                op = step["op"]
-                image_path = step["image"]
-                confidence = step.get("confidence")
-                timeout = step.get("timeout_sec", 30.0)
-                poll = step.get("poll_sec", 0.5)
-                move_ms = step.get("move_ms", 150)
-                next_ok = step.get("next_ok")
-                next_fail = step.get("next_fail")
-
-                if op == "Resme Tıkla":
-                    self._thread_status(f"[{idx}] Resme tıkla: {os.path.basename(image_path)}")
-                    ok = click_image(
-                        image_path,
-                        move_duration=max(0.0, float(move_ms) / 1000.0),
-                        confidence=confidence,
-                    )
-                elif op == "Resmin Kaybolmasını Bekle":
-                    self._thread_status(f"[{idx}] Kaybolmasını bekle: {os.path.basename(image_path)}")
-                    ok = wait_for_disappear(
-                        image_path,
-                        timeout_sec=float(timeout),
-                        poll_sec=float(poll),
-                        confidence=confidence,
-                    )
-                elif op == "Resmin Görünmesini Bekle":
-                    self._thread_status(f"[{idx}] Görünmesini bekle: {os.path.basename(image_path)}")
-                    ok = wait_for_appear(
-                        image_path,
-                        timeout_sec=float(timeout),
-                        poll_sec=float(poll),
-                        confidence=confidence,
-                    )
-                elif op == "Fonksiyon Çağır":
-                    func_name = step.get("call_func")
-                    self._thread_status(f"[{idx}] Fonksiyon çağır: {func_name}")
-                    ok = self._run_sub_function(func_name)
-                elif op == "Değişken Ata":
-                    ok = self._exec_set_var(step)
-                elif op == "Eğer":
-                    ok = self._exec_if(step)
-                else:
-                    self._thread_status(f"[{idx}] Bilinmeyen işlem: {op}")
-                    ok = False
-
-                # Dallanma mantığı: next_ok / next_fail (1-based). Boşsa sıradaki adıma geç.
-                if ok:
-                    if next_ok:
-                        try:
-                            idx = int(next_ok)
-                            continue
-                        except ValueError:
-                            pass
-                    idx += 1
-                else:
-                    if next_fail:
-                        try:
-                            idx = int(next_fail)
-                            continue
-                        except ValueError:
-                            pass
-                    idx += 1
-
-            self._thread_status("Makro tamamlandı.")
+            ExecutionContext(program, self.variables, self._thread_status).run(func_name)
+            self._thread_status(f"Makro tamamlandı. ({locate_hints.summary()}, {match_cache.summary()})")
         except Exception as e:
             self._thread_status(f"Hata: {e}")
         finally:
+            background_capturer.stop()
+            try:
+                scale_memory.save()
+            except OSError:
+                pass
+            if tracer.enabled:
+                try:
+                    tracer.export(env_trace_path())
+                except OSError as e:
+                    self._thread_status(f"İz yazılamadı: {e}")
             self.after(0, lambda: self._set_buttons_state(disabled=False))
 
-    def _run_macro_safe(self, steps: list[dict]) -> None:
+    def _run_macro_safe(self, program: Program, func_name: str) -> None:
         try:
-            self._run_macro(steps)
+            self._run_macro(program, func_name)
         except Exception as e:
             self._thread_status(f"Hata: {e}")
 
     def _thread_status(self, text: str) -> None:
         self.after(0, lambda t=text: self.set_status(t))
 
-    def _run_sub_function(self, name: str | None) -> bool:
-        # None or unknown → fail
-        if not name or name not in self.functions:
-            return False
-        steps = self.functions.get(name, [])
-        # Alt fonksiyonda dallanma kendi içinde çalışır, bitince True döndürür
-        try:
-            idx = 1
-            while 1 <= idx <= len(steps):
-                step = steps[idx - 1]
-                op = step["op"]
-                image_path = step.get("image", "")
-                confidence = step.get("confidence")
-                timeout = step.get("timeout_sec", 30.0)
-                poll = step.get("poll_sec", 0.5)
-                move_ms = step.get("move_ms", 150)
-                next_ok = step.get("next_ok")
-                next_fail = step.get("next_fail")
-
-                if op == "Resme Tıkla":
-                    ok = click_image(image_path, move_duration=max(0.0, float(move_ms) / 1000.0), confidence=confidence)
-                elif op == "Resmin Kaybolmasını Bekle":
-                    ok = wait_for_disappear(image_path, timeout_sec=float(timeout), poll_sec=float(poll), confidence=confidence)
-                elif op == "Resmin Görünmesini Bekle":
-                    ok = wait_for_appear(image_path, timeout_sec=float(timeout), poll_sec=float(poll), confidence=confidence)
-                elif op == "Fonksiyon Çağır":
-                    ok = self._run_sub_function(step.get("call_func"))
-                elif op == "Değişken Ata":
-                    ok = self._exec_set_var(step)
-                elif op == "Eğer":
-                    ok = self._exec_if(step)
-                else:
-                    ok = False
-
-                if ok:
-                    if next_ok:
-                        try:
-                            idx = int(next_ok)
-                            continue
-                        except ValueError:
-                            pass
-                    idx += 1
-                else:
-                    if next_fail:
-                        try:
-                            idx = int(next_fail)
-                            continue
-                        except ValueError:
-                            pass
-                    idx += 1
-            return True
-        except Exception:
-            return False
-
-    # --- Variables ---
-    def _parse_value(self, value_str: str, value_type: str):
-        t = (value_type or "string").lower()
-        if t == "int":
-            try:
-                return int(value_str)
-            except Exception:
-                return 0
-        if t == "bool":
-            return str(value_str).strip().lower() in ("1", "true", "yes", "on")
-        return str(value_str)
-
-    def _exec_set_var(self, step: dict) -> bool:
-        name = step.get("var_name", "").strip()
-        if not name:
-            return False
-        value = self._parse_value(step.get("var_value", ""), step.get("var_type", "string"))
-        if not hasattr(self, "variables"):
-            self.variables = {}
-
-        if "+=" in value:
-            value = value.replace("+=", "")
-            self.variables[name] += int(value)
-        else:
-            self.variables[name] = value
-        self._thread_status(f"Değişken ata: {name} = {value}")
-        return True
-
-    def _exec_if(self, step: dict) -> bool:
-        name = step.get("var_name", "").strip()
-        if not hasattr(self, "variables"):
-            self.variables = {}
-        left = self.variables.get(name)
-        right = self._parse_value(step.get("var_value", ""), step.get("var_type", "string"))
-        cmp_op = step.get("cmp", "==")
-        result = (left == right) if cmp_op == "==" else (left != right)
-        self._thread_status(f"Eğer: {name} {cmp_op} {right} → {result}")
-        return result
-
     # --- Steps helpers ---
-    def refresh_images_list(self) -> None:
-        images_dir = ensure_images_dir()
-        files = sorted([f for f in os.listdir(images_dir) if f.lower().endswith((".png", ".jpg", ".jpeg"))])
+    def refresh_images_list(self, force: bool = False) -> None:
+        if force:
+            self.image_library.scan(force=True)
+        files = self.image_library.names()
         self.new_image_combo["values"] = files
         if files and not self.new_image_var.get():
             self.new_image_var.set(files[0])
@@ -582,6 +596,15 @@ class ImageRecognitionMacroApp(tk.Tk):
             if not os.path.exists(img_path):
                 messagebox.showwarning("Uyarı", "Seçilen görsel bulunamadı.")
                 return
+        elif op_name == OP_WAIT_ANY:
+            branches = parse_branches(self.new_branches_var.get(), images_dir)
+            if not branches:
+                messagebox.showwarning("Uyarı", "En az bir görsel=adım dalı girin.")
+                return
+            missing = [os.path.basename(b["image"]) for b in branches if not os.path.exists(b["image"])]
+            if missing:
+                messagebox.showwarning("Uyarı", f"Görsel bulunamadı: {', '.join(missing)}")
+                return
         elif op_name == "Fonksiyon Çağır":
             call_name = self.new_call_func_var.get().strip()
             if not call_name or call_name not in self.functions:
@@ -605,6 +628,7 @@ class ImageRecognitionMacroApp(tk.Tk):
             conf = float(self.new_conf_var.get()) if self.new_conf_var.get() != "" else None
         except ValueError:
             conf = None
+        scales = parse_scales(self.new_scales_var.get())
 
         step = {"op": op_name}
         # Ortak dallanma alanları
@@ -616,8 +640,24 @@ class ImageRecognitionMacroApp(tk.Tk):
                 "image": img_path,
                 "timeout_sec": timeout,
                 "poll_sec": poll_val,
+                "poll_mode": self.new_poll_mode_var.get(),
                 "move_ms": move_ms,
                 "confidence": conf,
+                "region": self.new_region,
+                "color_mode": self.new_color_mode_var.get() or None,
+                "scales": list(scales) if scales else None,
+            })
+        elif op_name == OP_WAIT_ANY:
+            step.update({
+                "images": branches,
+                "pick": self.new_pick_var.get(),
+                "timeout_sec": timeout,
+                "poll_sec": poll_val,
+                "poll_mode": self.new_poll_mode_var.get(),
+                "confidence": conf,
+                "region": self.new_region,
+                "color_mode": self.new_color_mode_var.get() or None,
+                "scales": list(scales) if scales else None,
             })
         elif op_name == "Fonksiyon Çağır":
             step["call_func"] = call_name
@@ -629,8 +669,7 @@ class ImageRecognitionMacroApp(tk.Tk):
                 step["cmp"] = self.new_cmp_var.get()
         if op_name == "Fonksiyon Çağır":
             step["call_func"] = call_name
-        self.steps.append(step)
-        self._sync_steps_tree()
+        self._insert_step(len(self.steps), step)
         # Temizle
         self.new_var_name_var.set("")
         self.new_var_value_var.set("")
@@ -665,7 +704,11 @@ class ImageRecognitionMacroApp(tk.Tk):
             self.move_entry.grid_remove()
             self.poll_label.grid_remove()
             self.poll_entry.grid_remove()
-        elif op_name in ("Resme Tıkla", "Resmin Kaybolmasını Bekle", "Resmin Görünmesini Bekle"):
+            self.poll_mode_label.grid_remove()
+            self.poll_mode_combo.grid_remove()
+            self._set_search_widgets_visible(False)
+            self.branches_row.grid_remove()
+        elif op_name in IMAGE_OPS or op_name == OP_WAIT_ANY:
             # Show image widgets
             self.image_label.grid(row=0, column=2, sticky=tk.W, padx=(16, 6))
             self.new_image_combo.grid(row=0, column=3, sticky=tk.W)
@@ -691,6 +734,13 @@ class ImageRecognitionMacroApp(tk.Tk):
             self.move_entry.grid(row=1, column=5, sticky=tk.W, pady=(6, 0))
             self.poll_label.grid(row=1, column=6, sticky=tk.W, padx=(16, 6), pady=(6, 0))
             self.poll_entry.grid(row=1, column=7, sticky=tk.W, pady=(6, 0))
+            self.poll_mode_label.grid(row=1, column=8, sticky=tk.W, padx=(16, 6), pady=(6, 0))
+            self.poll_mode_combo.grid(row=1, column=9, sticky=tk.W, pady=(6, 0))
+            self._set_search_widgets_visible(True)
+            if op_name == OP_WAIT_ANY:
+                self.branches_row.grid()
+            else:
+                self.branches_row.grid_remove()
         else:
             # Variable/Condition widgets visible
             self.var_name_label.grid(row=3, column=0, sticky=tk.W, pady=(6, 0))
@@ -720,6 +770,44 @@ class ImageRecognitionMacroApp(tk.Tk):
             self.move_entry.grid_remove()
             self.poll_label.grid_remove()
             self.poll_entry.grid_remove()
+            self.poll_mode_label.grid_remove()
+            self.poll_mode_combo.grid_remove()
+            self._set_search_widgets_visible(False)
+            self.branches_row.grid_remove()
+
+    def _set_search_widgets_visible(self, visible: bool) -> None:
+        # Arama bölgesi, renk modu ve ölçekler yalnızca görsel arayan işlemlerde
+        widgets = (
+            self.region_label,
+            self.region_value_label,
+            self.region_select_btn,
+            self.region_clear_btn,
+            self.color_mode_label,
+            self.color_mode_combo,
+            self.scales_label,
+            self.scales_entry,
+        )
+        for w in widgets:
+            if visible:
+                w.grid()
+            else:
+                w.grid_remove()
+
+    def _check_program(self, action: str | None) -> bool:
+        """Statik analiz. Uyarılar durum satırına yazılır; hata varsa action verilmişse ("Kaydetmeye" gibi)
+        devam edilip edilmeyeceği sorulur, verilmemişse yalnızca gösterilir."""
+        issues = analyze(self.functions)
+        if not issues:
+            return True
+        errors = [i for i in issues if i.severity == ERROR]
+        self.set_status(f"Analiz: {len(errors)} hata, {len(issues) - len(errors)} uyarı — {issues[0]}")
+        if not errors:
+            return True
+        text = "\n".join(str(i) for i in errors[:15]) + ("\n..." if len(errors) > 15 else "")
+        if action is None:
+            messagebox.showwarning("Analiz", f"{len(errors)} hata bulundu:\n\n{text}")
+            return True
+        return messagebox.askyesno("Analiz", f"{len(errors)} hata bulundu:\n\n{text}\n\n{action} devam edilsin mi?")
 
     # --- Kaydet/Yükle ---
     def _export_state(self) -> dict:
@@ -733,6 +821,8 @@ class ImageRecognitionMacroApp(tk.Tk):
             data_funcs[fname] = out_steps
         return {
             "current_func": self.current_func_name,
+            "color_mode": self.color_mode_var.get(),
+            "scales": list(parse_scales(self.scales_var.get()) or []) or None,
             "functions": data_funcs,
         }
 
@@ -746,11 +836,15 @@ class ImageRecognitionMacroApp(tk.Tk):
             new_functions[fname] = restored
 
         self.functions = new_functions or {"Varsayılan": []}
+        self.color_mode_var.set(data.get("color_mode") or "rgb")
+        self.scales_var.set(format_scales(parse_scales(data.get("scales"))))
         desired = data.get("current_func")
         self.current_func_name = desired if desired in self.functions else list(self.functions.keys())[0]
         self.steps = self.functions[self.current_func_name]
         self._refresh_function_combo()
         self._sync_steps_tree()
+        # Paketten çıkarılan şablonlar listeye girsin
+        self.refresh_images_list(force=True)
 
     def save_bot(self) -> None:
         try:
@@ -759,14 +853,22 @@ class ImageRecognitionMacroApp(tk.Tk):
                 parent=self,
                 title="Botu Kaydet",
                 defaultextension=".json",
-                filetypes=[("JSON", "*.json")],
+                filetypes=[("JSON", "*.json"), ("Bot paketi", "*.botz")],
                 initialfile=default_name,
             )
             if not path:
                 return
+            if not self._check_program("Kaydetmeye"):
+                return
             data = self._export_state()
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            if path.lower().endswith(".botz"):
+                # Tek dosyalık taşınabilir paket: şablonlar ve hazır diziler içinde
+                from bundle import save_bundle
+
+                save_bundle(data, path)
+            else:
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False, indent=2)
             self.set_status(f"Kaydedildi: {os.path.basename(path)}")
         except Exception as e:
             messagebox.showerror("Kaydetme Hatası", f"Kaydedilemedi:\n{e}")
@@ -776,14 +878,14 @@ class ImageRecognitionMacroApp(tk.Tk):
             path = filedialog.askopenfilename(
                 parent=self,
                 title="Botu Yükle",
-                filetypes=[("JSON", "*.json")],
+                filetypes=[("Bot dosyaları", "*.json *.botz"), ("JSON", "*.json"), ("Bot paketi", "*.botz")],
             )
             if not path:
                 return
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            self._import_state(data)
+            # Paket şablonları düzenlenebilsin diye ./images altına çıkarılır
+            self._import_state(load_bot(path, extract_to=ensure_images_dir()))
             self.set_status(f"Yüklendi: {os.path.basename(path)}")
+            self._check_program(None)
         except Exception as e:
             messagebox.showerror("Yükleme Hatası", f"Yüklenemedi:\n{e}")
 
@@ -810,7 +912,7 @@ class ImageRecognitionMacroApp(tk.Tk):
         # İşlem
         ttk.Label(frm, text="İşlem:").grid(row=0, column=0, sticky=tk.W)
         op_var = tk.StringVar(value=step.get("op", "Resme Tıkla"))
-        op_combo = ttk.Combobox(frm, textvariable=op_var, values=["Resme Tıkla", "Resmin Kaybolmasını Bekle", "Resmin Görünmesini Bekle", "Fonksiyon Çağır", "Değişken Ata", "Eğer"], state="readonly")
+        op_combo = ttk.Combobox(frm, textvariable=op_var, values=list(OPS), state="readonly")
         op_combo.grid(row=0, column=1, sticky=tk.W, padx=(6, 0))
 
         # Görsel
@@ -821,8 +923,7 @@ class ImageRecognitionMacroApp(tk.Tk):
         img_combo.grid(row=1, column=1, sticky=tk.W, padx=(6, 0), pady=(8, 0))
         # Doldur
         images_dir = ensure_images_dir()
-        files = sorted([f for f in os.listdir(images_dir) if f.lower().endswith((".png", ".jpg", ".jpeg"))])
-        img_combo["values"] = files
+        img_combo["values"] = self.image_library.names()
 
         # Çağrılacak fonksiyon
         ttk.Label(frm, text="Fonksiyon:").grid(row=1, column=2, sticky=tk.W, pady=(8, 0))
@@ -830,13 +931,26 @@ class ImageRecognitionMacroApp(tk.Tk):
         call_combo = ttk.Combobox(frm, textvariable=call_var, values=list(self.functions.keys()), state="readonly", width=24)
         call_combo.grid(row=1, column=3, sticky=tk.W, padx=(6, 0), pady=(8, 0))
 
+        # Resimlerden Birini Bekle dalları
+        branch_row = ttk.Frame(frm)
+        branches_var = tk.StringVar(value=format_branches(step.get("images")))
+        ttk.Entry(branch_row, textvariable=branches_var, width=50).pack(side=tk.LEFT)
+        ttk.Label(branch_row, text="Seçim:").pack(side=tk.LEFT, padx=(16, 6))
+        pick_var = tk.StringVar(value=step.get("pick") or "first")
+        ttk.Combobox(branch_row, textvariable=pick_var, values=["first", "best"], state="readonly", width=7).pack(side=tk.LEFT)
+
         def update_edit_visibility(*_a):
+            branch_row.grid_remove()
             if op_var.get() == "Fonksiyon Çağır":
                 img_combo.grid_remove()
                 call_combo.grid(row=1, column=3, sticky=tk.W, padx=(6, 0), pady=(8, 0))
             elif op_var.get() in ("Değişken Ata", "Eğer"):
                 img_combo.grid_remove()
                 call_combo.grid_remove()
+            elif op_var.get() == OP_WAIT_ANY:
+                img_combo.grid_remove()
+                call_combo.grid_remove()
+                branch_row.grid(row=1, column=1, columnspan=5, sticky=tk.W, padx=(6, 0), pady=(8, 0))
             else:
                 img_combo.grid(row=1, column=1, sticky=tk.W, padx=(6, 0), pady=(8, 0))
                 call_combo.grid_remove()
@@ -857,10 +971,42 @@ class ImageRecognitionMacroApp(tk.Tk):
         poll_var = tk.StringVar(value=str(step.get("poll_sec", 0.5)))
         ttk.Entry(frm, textvariable=poll_var, width=10).grid(row=3, column=3, sticky=tk.W, padx=(6, 0))
 
+        ttk.Label(frm, text="Poll modu:").grid(row=3, column=4, sticky=tk.W, padx=(16, 6))
+        poll_mode_var = tk.StringVar(value=step.get("poll_mode") or "fixed")
+        ttk.Combobox(frm, textvariable=poll_mode_var, values=["fixed", "adaptive"], state="readonly", width=9).grid(row=3, column=5, sticky=tk.W)
+
+        ttk.Label(frm, text="Renk:").grid(row=3, column=6, sticky=tk.W, padx=(16, 6))
+        color_mode_var = tk.StringVar(value=step.get("color_mode") or "")
+        ttk.Combobox(frm, textvariable=color_mode_var, values=["", *matchers.COLOR_MODES], state="readonly", width=9).grid(row=3, column=7, sticky=tk.W)
+
+        ttk.Label(frm, text="Ölçekler:").grid(row=3, column=8, sticky=tk.W, padx=(16, 6))
+        scales_var = tk.StringVar(value=format_scales(parse_scales(step.get("scales"))))
+        ttk.Entry(frm, textvariable=scales_var, width=12).grid(row=3, column=9, sticky=tk.W)
+
         ttk.Label(frm, text="Move(ms):").grid(row=4, column=0, sticky=tk.W)
         move_var = tk.StringVar(value=str(step.get("move_ms", 150)))
         ttk.Entry(frm, textvariable=move_var, width=10).grid(row=4, column=1, sticky=tk.W, padx=(6, 0))
 
+        # Arama bölgesi
+        ttk.Label(frm, text="Arama Bölgesi:").grid(row=4, column=2, sticky=tk.W)
+        region_holder: list = [step.get("region")]
+        region_text = tk.StringVar(value=format_region(region_holder[0]))
+        region_row = ttk.Frame(frm)
+        region_row.grid(row=4, column=3, columnspan=3, sticky=tk.W, padx=(6, 0))
+        ttk.Label(region_row, textvariable=region_text).pack(side=tk.LEFT)
+
+        def set_edit_region(region) -> None:
+            region_holder[0] = region
+            region_text.set(format_region(region))
+
+        def pick_edit_region() -> None:
+            region = select_region()
+            if region:
+                set_edit_region(region)
+
+        ttk.Button(region_row, text="Seç", command=pick_edit_region).pack(side=tk.LEFT, padx=(6, 0))
+        ttk.Button(region_row, text="Temizle", command=lambda: set_edit_region(None)).pack(side=tk.LEFT, padx=(6, 0))
+
         # Variable widgets in edit dialog
         ttk.Label(frm, text="Değişken:").grid(row=5, column=0, sticky=tk.W, pady=(8, 0))
         e_var_name = tk.StringVar(value=step.get("var_name", ""))
@@ -891,7 +1037,17 @@ class ImageRecognitionMacroApp(tk.Tk):
         def save_and_close():
             # Validate and update
             sel_img_name = img_var.get().strip()
-            if op_var.get() != "Fonksiyon Çağır" and op_var.get() != "Değişken Ata" and op_var.get() != "Eğer":
+            branches = None
+            if op_var.get() == OP_WAIT_ANY:
+                branches = parse_branches(branches_var.get(), images_dir)
+                if not branches:
+                    messagebox.showwarning("Uyarı", "En az bir görsel=adım dalı girin.", parent=win)
+                    return
+                missing = [os.path.basename(b["image"]) for b in branches if not os.path.exists(b["image"])]
+                if missing:
+                    messagebox.showwarning("Uyarı", f"Görsel bulunamadı: {', '.join(missing)}", parent=win)
+                    return
+            if op_var.get() in IMAGE_OPS:
                 if not sel_img_name:
                     messagebox.showwarning("Uyarı", "Görsel adı boş olamaz.", parent=win)
                     return
@@ -913,6 +1069,7 @@ class ImageRecognitionMacroApp(tk.Tk):
                 c_val = float(conf_var.get()) if conf_var.get() != "" else None
             except ValueError:
                 c_val = None
+            s_val = parse_scales(scales_var.get())
             try:
                 p_val = float(poll_var.get() or 0.5)
             except ValueError:
@@ -925,9 +1082,16 @@ class ImageRecognitionMacroApp(tk.Tk):
                 "move_ms": m_ms,
                 "confidence": c_val,
                 "poll_sec": p_val,
+                "poll_mode": poll_mode_var.get(),
+                "region": region_holder[0] if op_var.get() in IMAGE_OPS or op_var.get() == OP_WAIT_ANY else None,
+                "color_mode": color_mode_var.get() or None,
+                "scales": list(s_val) if s_val else None,
                 "next_ok": next_ok_var.get().strip() or None,
                 "next_fail": next_fail_var.get().strip() or None,
             }
+            if branches is not None:
+                updated["images"] = branches
+                updated["pick"] = pick_var.get()
             if op_var.get() == "Fonksiyon Çağır":
                 updated["call_func"] = call_var.get().strip() or None
             else:
@@ -939,7 +1103,11 @@ class ImageRecognitionMacroApp(tk.Tk):
                 if op_var.get() == "Eğer":
                     updated["cmp"] = e_cmp.get()
             step.update(updated)
-            self._sync_steps_tree()
+            if branches is None:
+                # Başka işleme çevrilen "Resimlerden Birini Bekle" adımının dalları bot dosyasında kalmasın
+                step.pop("images", None)
+                step.pop("pick", None)
+            self._update_step_rows(index)
             win.destroy()
 
         ttk.Button(btn_row, text="Kaydet", command=save_and_close).pack(side=tk.LEFT)
@@ -951,8 +1119,7 @@ class ImageRecognitionMacroApp(tk.Tk):
             return
         index = int(self.tree.item(sel[0], "values")[0]) - 1
         if 0 <= index < len(self.steps):
-            del self.steps[index]
-            self._sync_steps_tree()
+            self._delete_step(index)
 
     def move_step(self, delta: int) -> None:
         sel = self.tree.selection()
@@ -961,66 +1128,100 @@ class ImageRecognitionMacroApp(tk.Tk):
         index = int(self.tree.item(sel[0], "values")[0]) - 1
         new_index = index + delta
         if 0 <= new_index < len(self.steps):
-            self.steps[index], self.steps[new_index] = self.steps[new_index], self.steps[index]
-            self._sync_steps_tree()
-            self.tree.selection_set(self.tree.get_children()[new_index])
+            self._swap_steps(index, new_index)
+            self.tree.selection_set(self._row_ids[new_index])
+            self.tree.see(self._row_ids[new_index])
 
     def clear_steps(self) -> None:
         self.steps.clear()
         self._sync_steps_tree()
 
+    # --- Adım tablosu ---
+    # Düzenlemeler yalnızca etkilenen satırlara uygulanır; tam yeniden çizim yalnızca liste
+    # tamamen değiştiğinde (fonksiyon değişimi, yükleme, temizleme) yapılır.
+    def _step_row(self, idx: int, step: dict) -> tuple:
+        params = []
+        if step["op"] == "Resme Tıkla":
+            params.append(f"move={step.get('move_ms', 150)}ms")
+        else:
+            params.append(f"timeout={step.get('timeout_sec', 30)}s")
+        if step.get("confidence") is not None:
+            params.append(f"conf={step['confidence']}")
+        if step.get("region"):
+            params.append(f"bölge={format_region(step['region'])}")
+        if step.get("poll_mode") == "adaptive":
+            params.append("poll=adaptive")
+        if step.get("color_mode"):
+            params.append(f"renk={step['color_mode']}")
+        if step.get("scales"):
+            params.append(f"ölçek={'/'.join(f'{s:g}' for s in step['scales'])}")
+        if step["op"] == "Değişken Ata":
+            target = f"{step['var_type']} {step['var_name']} = {step['var_value']}"
+        elif step["op"] == "Eğer":
+            target = f"if {step['var_type']} {step['var_name']} {step['cmp']} {step['var_value']}"
+        elif step["op"] == OP_WAIT_ANY:
+            target = format_branches(step.get("images"))
+            params.append(f"seçim={step.get('pick') or 'first'}")
+        elif step["op"] == "Fonksiyon Çağır":
+            target = f" {step['call_func']}"
+        else:
+            target = os.path.basename(step["image"])
+        return (idx, step["op"], target, ", ".join(params), step.get("next_ok") or "", step.get("next_fail") or "")
+
     def _sync_steps_tree(self) -> None:
-        for i in self.tree.get_children():
-            self.tree.delete(i)
-        for idx, step in enumerate(self.steps, start=1):
-            params = []
-            if step["op"] == "Resme Tıkla":
-                params.append(f"move={step.get('move_ms', 150)}ms")
-            else:
-                params.append(f"timeout={step.get('timeout_sec', 30)}s")
-            if step.get("confidence") is not None:
-                params.append(f"conf={step['confidence']}")
-            if step["op"] == "Değişken Ata":
-                self.tree.insert("", tk.END, values=(
-                idx,
-                step["op"],
-                f"{step['var_type']} {step['var_name']} = {step['var_value']}",
-                ", ".join(params),
-                step.get("next_ok") or "",
-                step.get("next_fail") or "",
-                ))
-            elif step["op"] == "Eğer":
-                self.tree.insert("", tk.END, values=(
-                    idx,
-                    step["op"],
-                    f"if {step['var_type']} {step['var_name']} {step['cmp']} {step['var_value']}",
-                    ", ".join(params),
-                    step.get("next_ok") or "",
-                    step.get("next_fail") or "",
-                ))
-            elif step["op"] == "Fonksiyon Çağır":
-                self.tree.insert("", tk.END, values=(
-                    idx,
-                    step["op"],
-                    f" {step['call_func']}",
-                    ", ".join(params),
-                    step.get("next_ok") or "",
-                    step.get("next_fail") or "",
-                ))
-            else:
-                self.tree.insert("", tk.END, values=(
-                    idx,
-                    step["op"],
-                    os.path.basename(step["image"]),
-                    ", ".join(params),
-                    step.get("next_ok") or "",
-                    step.get("next_fail") or "",
-                ))
-        # Keep images list fresh
-        self.refresh_images_list()
+        if self._tree_fill_job is not None:
+            self.after_cancel(self._tree_fill_job)
+            self._tree_fill_job = None
+        self.tree.delete(*self.tree.get_children())
+        self._row_ids = []
+        self._fill_tree_rows(TREE_FIRST_CHUNK)
+
+    def _fill_tree_rows(self, limit: int) -> None:
+        self._tree_fill_job = None
+        start = len(self._row_ids)
+        end = min(len(self.steps), start + limit)
+        for index in range(start, end):
+            self._row_ids.append(self.tree.insert("", tk.END, values=self._step_row(index + 1, self.steps[index])))
+        if end < len(self.steps):
+            self._tree_fill_job = self.after(1, self._fill_tree_rows, TREE_CHUNK)
+
+    def _flush_tree_fill(self) -> None:
+        # Düzenlemeden önce bekleyen satırları çiz; satır listesi adım listesiyle hizalı kalsın
+        if self._tree_fill_job is not None:
+            self.after_cancel(self._tree_fill_job)
+            self._fill_tree_rows(len(self.steps))
+
+    def _renumber_rows(self, start: int) -> None:
+        # Ekleme/silmede yalnızca sonraki satırların "#" sütunu kayar
+        for index in range(start, len(self._row_ids)):
+            self.tree.set(self._row_ids[index], "#", index + 1)
+
+    def _insert_step(self, index: int, step: dict) -> None:
+        self._flush_tree_fill()
+        self.steps.insert(index, step)
+        self._row_ids.insert(index, self.tree.insert("", index, values=self._step_row(index + 1, step)))
+        self._renumber_rows(index + 1)
+
+    def _delete_step(self, index: int) -> None:
+        self._flush_tree_fill()
+        del self.steps[index]
+        self.tree.delete(self._row_ids.pop(index))
+        self._renumber_rows(index)
+
+    def _swap_steps(self, a: int, b: int) -> None:
+        self._flush_tree_fill()
+        self.steps[a], self.steps[b] = self.steps[b], self.steps[a]
+        self._update_step_rows(a, b)
+
+    def _update_step_rows(self, *indices: int) -> None:
+        self._flush_tree_fill()
+        for index in indices:
+            self.tree.item(self._row_ids[index], values=self._step_row(index + 1, self.steps[index]))
 
 
 if __name__ == "__main__":
+    import pyautogui
+
     # PyAutoGUI ayarları (isteğe bağlı)
     pyautogui.PAUSE = 0.1
     pyautogui.FAILSAFE = True
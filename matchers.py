@@ -0,0 +1,456 @@
+import random
+import sys
+import time
+from collections import namedtuple
+from functools import lru_cache
+
+from PIL import Image, ImageDraw
+
+
+@lru_cache(maxsize=None)
+def _numpy():
+    # numpy ilk eşlemede yüklenir (açılış süresi); yoksa piramit eşleyici kullanılamaz, pyscreeze'e geri dönülür
+    try:
+        import numpy
+        return numpy
+    except Exception:
+        return None
+
+
+# score: tam çözünürlükteki NCC skoru (skor veremeyen arka uçlarda 1.0)
+Box = namedtuple("Box", "left top width height score", defaults=(1.0,))
+
+# pyscreeze'in OpenCV yolundaki varsayılan eşik değeri
+DEFAULT_CONFIDENCE = 0.999
+
+
+def available() -> bool:
+    return _numpy() is not None
+
+
+@lru_cache(maxsize=None)
+def _cv2():
+    # OpenCV yalnızca bir kez denenir
+    try:
+        import cv2
+        return cv2
+    except Exception:
+        return None
+
+
+# rgb: üç kanal; gray: parlaklık (L); r/g/b: tek kanal. Tek kanallı modlar eşlemeyi ~3 kat hızlandırır.
+COLOR_MODES = ("rgb", "gray", "r", "g", "b")
+
+
+def convert_mode(image: Image.Image, mode: str | None) -> Image.Image:
+    # mode None: görüntü zaten dönüştürülmüş, olduğu gibi kullan
+    if mode is None:
+        return image
+    if mode == "gray":
+        return image if image.mode == "L" else image.convert("L")
+    if mode in ("r", "g", "b"):
+        return (image if image.mode == "RGB" else image.convert("RGB")).getchannel(mode.upper())
+    if mode != "rgb":
+        raise ValueError(f"Bilinmeyen renk modu: {mode} (seçenekler: {', '.join(COLOR_MODES)})")
+    return image if image.mode == "RGB" else image.convert("RGB")
+
+
+def to_array(image: Image.Image, dtype: str = "float64"):
+    # (h, w, kanal) dizisi; tek kanallı (L) görüntüler tek kanallı kalır
+    np = _numpy()
+    arr = np.asarray(image if image.mode in ("RGB", "L") else image.convert("RGB"), dtype=dtype)
+    return arr if arr.ndim == 3 else arr[:, :, None]
+
+
+def _ncc_stats(arr):
+    # Ortalaması çıkarılmış şablon ve karesel normu (NCC paydası için)
+    t0 = arr - arr.reshape(-1, arr.shape[2]).mean(0)
+    return t0, float((t0 * t0).sum())
+
+
+class Needle:
+    """Eşlemeye hazırlanmış şablon: renk moduna bir kez çevrilir; dizi, NCC istatistikleri ve
+    küçültülmüş kopyalar ilk kullanımda hesaplanıp saklanır."""
+
+    def __init__(self, image: Image.Image, mode: str | None = "rgb") -> None:
+        self.mode = mode
+        self.image = convert_mode(image, mode)
+        self.width, self.height = self.image.size
+        self._arrays: dict = {}
+        self._stats = None
+        self._reduced: dict[int, "Needle"] = {}
+
+    @classmethod
+    def prepared(cls, image: Image.Image, mode: str) -> "Needle":
+        # Zaten renk moduna çevrilmiş görselden (ör. bot paketindeki hazır dizi); yeniden dönüştürülmez
+        needle = cls(image, None)
+        needle.mode = mode
+        return needle
+
+    @property
+    def size(self) -> tuple[int, int]:
+        return self.width, self.height
+
+    def array(self, dtype: str = "float64"):
+        arr = self._arrays.get(dtype)
+        if arr is None:
+            arr = self._arrays[dtype] = to_array(self.image, dtype)
+        return arr
+
+    def stats(self):
+        if self._stats is None:
+            self._stats = _ncc_stats(self.array())
+        return self._stats
+
+    def reduced(self, factor: int) -> "Needle":
+        needle = self._reduced.get(factor)
+        if needle is None:
+            needle = self._reduced[factor] = Needle(self.image.reduce(factor), None)
+        return needle
+
+
+class Haystack:
+    """Aranacak kare: renk moduna bir kez çevrilir; dizi ve küçültülmüş diziler saklanır, böylece aynı
+    karede birden çok şablon ya da aday pencere için dönüştürme tekrarlanmaz (pencereler dilimdir)."""
+
+    def __init__(self, image: Image.Image, mode: str | None = "rgb") -> None:
+        self.mode = mode
+        self.image = convert_mode(image, mode)
+        self.width, self.height = self.image.size
+        self._arrays: dict = {}
+
+    def array(self, dtype: str = "float64", factor: int = 1):
+        arr = self._arrays.get((dtype, factor))
+        if arr is None:
+            image = self.image if factor == 1 else self.image.reduce(factor)
+            arr = self._arrays[(dtype, factor)] = to_array(image, dtype)
+        return arr
+
+
+def as_needle(needle, mode: str | None = "rgb") -> Needle:
+    return needle if isinstance(needle, Needle) else Needle(needle, mode)
+
+
+def as_haystack(haystack, mode: str | None = "rgb") -> Haystack:
+    return haystack if isinstance(haystack, Haystack) else Haystack(haystack, mode)
+
+
+def _window_sums(arr, h: int, w: int):
+    np = _numpy()
+    # Integral görüntü ile her (h, w) penceresinin toplamı
+    ii = np.zeros((arr.shape[0] + 1, arr.shape[1] + 1) + arr.shape[2:], dtype=np.float64)
+    ii[1:, 1:] = arr.cumsum(0).cumsum(1)
+    return ii[h:, w:] - ii[:-h, w:] - ii[h:, :-w] + ii[:-h, :-w]
+
+
+def ncc_map(haystack, needle):
+    """Normalized cross-correlation (OpenCV TM_CCOEFF_NORMED) for every valid position, via FFT.
+    needle may be an array or a Needle (its mean-subtracted template and norm are reused)."""
+    np = _numpy()
+    if isinstance(needle, Needle):
+        (t0, t_norm), needle = needle.stats(), needle.array()
+    else:
+        t0, t_norm = _ncc_stats(needle)
+    H, W = haystack.shape[:2]
+    h, w = needle.shape[:2]
+    n = float(h * w)
+
+    flat = t_norm < 1e-6
+    num = np.zeros((H - h + 1, W - w + 1), dtype=np.float64)
+    var = np.zeros_like(num)
+    mean_diff = np.zeros_like(num)
+    for c in range(haystack.shape[2]):
+        f = haystack[:, :, c]
+        s1 = _window_sums(f, h, w)
+        s2 = _window_sums(f * f, h, w)
+        var += s2 - s1 * s1 / n
+        if flat:
+            mean_diff = np.maximum(mean_diff, np.abs(s1 / n - needle[0, 0, c]))
+        else:
+            spec = np.fft.rfft2(f) * np.conj(np.fft.rfft2(t0[:, :, c], s=(H, W)))
+            num += np.fft.irfft2(spec, s=(H, W))[: H - h + 1, : W - w + 1]
+
+    if flat:
+        # Düz (tek renkli) şablon: korelasyon tanımsız, pencere de düz ve aynı renkteyse eşleşme say
+        return np.where((var < 1e-3 * n) & (mean_diff < 1.0), 1.0, 0.0)
+    denom = np.sqrt(np.maximum(var, 0.0) * t_norm)
+    return np.where(denom > 1e-6, num / np.maximum(denom, 1e-6), 0.0)
+
+
+def _choose_factor(h: int, w: int) -> int:
+    # Küçültülmüş şablon en az ~16 piksel kalmalı; aksi halde kaba skorlar güvenilmez
+    side = min(h, w)
+    if side >= 64:
+        return 4
+    if side >= 24:
+        return 2
+    return 1
+
+
+def _top_peaks(scores, count: int, radius_y: int, radius_x: int, floor: float = -1.0):
+    np = _numpy()
+    scores = scores.copy()
+    peaks = []
+    for _ in range(count):
+        idx = int(np.argmax(scores))
+        y, x = divmod(idx, scores.shape[1])
+        if not np.isfinite(scores[y, x]) or scores[y, x] < floor:
+            break
+        peaks.append((y, x, float(scores[y, x])))
+        scores[max(0, y - radius_y): y + radius_y + 1, max(0, x - radius_x): x + radius_x + 1] = -np.inf
+    return peaks
+
+
+def exhaustive_locate(haystack_img, needle_img, confidence: float | None = None, score_fn=ncc_map, mode: str | None = "rgb"):
+    np = _numpy()
+    confidence = DEFAULT_CONFIDENCE if confidence is None else confidence
+    haystack, needle = as_haystack(haystack_img, mode), as_needle(needle_img, mode)
+    w, h = needle.size
+    if w > haystack.width or h > haystack.height:
+        return None
+    scores = score_fn(haystack.array(_score_dtype(score_fn)), needle)
+    y, x = divmod(int(np.argmax(scores)), scores.shape[1])
+    if scores[y, x] < confidence:
+        return None
+    return Box(x, y, w, h, float(scores[y, x]))
+
+
+def pyramid_locate(
+    haystack_img,
+    needle_img,
+    confidence: float | None = None,
+    factor: int | None = None,
+    max_candidates: int = 32,
+    slack: float = 0.3,
+    score_fn=ncc_map,
+    mode: str | None = "rgb",
+):
+    """Kaba-ince eşleme: kare ve şablon 2x/4x küçültülür, düşük çözünürlükte aday tepeler bulunur,
+    yalnızca adayların çevresi tam çözünürlükte yeniden eşlenir. Eşik her zaman tam çözünürlükteki skora uygulanır.
+    PIL görüntüleri ya da hazırlanmış Haystack/Needle kabul eder."""
+    np = _numpy()
+    confidence = DEFAULT_CONFIDENCE if confidence is None else confidence
+    haystack, needle = as_haystack(haystack_img, mode), as_needle(needle_img, mode)
+    w, h = needle.size
+    if w > haystack.width or h > haystack.height:
+        return None
+    dtype = _score_dtype(score_fn)
+    f = factor or _choose_factor(h, w)
+    while f > 1:
+        # Şablonun ayrıntısı küçültmede kayboluyorsa (varyansın çoğu yüksek frekansta) daha az küçült
+        if needle.reduced(f).array().var(axis=(0, 1)).sum() >= 0.6 * needle.array().var(axis=(0, 1)).sum():
+            break
+        f //= 2
+    if f == 1:
+        return exhaustive_locate(haystack, needle, confidence, score_fn)
+
+    coarse = score_fn(haystack.array(dtype, f), needle.reduced(f))
+    full = haystack.array(dtype)
+    best: tuple[float, int, int] | None = None
+    # Hizalama kayması kaba skoru düşürür; eşiğin 'slack' kadar altındaki tepeler de aday sayılır
+    floor = min(confidence, 0.95) - slack
+    for cy, cx, _score in _top_peaks(coarse, max_candidates, max(1, h // (2 * f)), max(1, w // (2 * f)), floor):
+        # Aday çevresinde ±2f piksel tam çözünürlükte ara (kaba tepe bir blok kayabilir)
+        x0 = max(0, cx * f - 2 * f)
+        y0 = max(0, cy * f - 2 * f)
+        x1 = min(haystack.width - w, cx * f + 2 * f)
+        y1 = min(haystack.height - h, cy * f + 2 * f)
+        fine = score_fn(full[y0: y1 + h, x0: x1 + w], needle)
+        fy, fx = divmod(int(np.argmax(fine)), fine.shape[1])
+        score = float(fine[fy, fx])
+        if best is None or score > best[0]:
+            best = (score, x0 + fx, y0 + fy)
+    if best is None or best[0] < confidence:
+        return None
+    return Box(best[1], best[2], w, h, best[0])
+
+
+def cv2_ncc_map(haystack, needle):
+    np = _numpy()
+    cv2 = _cv2()
+    t_norm = needle.stats()[1] if isinstance(needle, Needle) else _ncc_stats(needle)[1]
+    if t_norm < 1e-6:
+        # TM_CCOEFF_NORMED düz şablonda her konumda 1 verir; ncc_map ile aynı kuralı uygula
+        return ncc_map(haystack.astype(np.float64), needle).astype(np.float32)
+    needle = needle.array("float32") if isinstance(needle, Needle) else needle.astype(np.float32)
+    return cv2.matchTemplate(haystack.astype(np.float32, copy=False), needle, cv2.TM_CCOEFF_NORMED)
+
+
+# Skor fonksiyonunun beklediği dizi tipi (OpenCV float32 ister; dönüştürmeyi kare başına bir kez yap)
+cv2_ncc_map.dtype = "float32"
+
+
+def _score_dtype(score_fn) -> str:
+    return getattr(score_fn, "dtype", "float64")
+
+
+class Matcher:
+    """Eşleyici arka uç arayüzü: kare içinde şablonu arar, Box veya None döndürür.
+    Kare/şablon PIL görüntüsü ya da aynı renk modunda hazırlanmış Haystack/Needle olabilir."""
+
+    name = ""
+    description = ""
+
+    def available(self) -> bool:
+        raise NotImplementedError
+
+    def supports_confidence(self) -> bool:
+        return True
+
+    def locate(self, haystack, needle, confidence: float | None = None, mode: str = "rgb"):
+        raise NotImplementedError
+
+
+class OpenCVMatcher(Matcher):
+    name = "opencv"
+    description = "OpenCV matchTemplate (TM_CCOEFF_NORMED), piramit ile"
+
+    def available(self) -> bool:
+        return _numpy() is not None and _cv2() is not None
+
+    def locate(self, haystack, needle, confidence=None, mode="rgb"):
+        return pyramid_locate(haystack, needle, confidence, score_fn=cv2_ncc_map, mode=mode)
+
+
+class NumpyMatcher(Matcher):
+    name = "numpy"
+    description = "Saf NumPy normalize çapraz korelasyon (FFT), piramit ile"
+
+    def available(self) -> bool:
+        return _numpy() is not None
+
+    def locate(self, haystack, needle, confidence=None, mode="rgb"):
+        return pyramid_locate(haystack, needle, confidence, mode=mode)
+
+
+class PyscreezeMatcher(Matcher):
+    name = "pyscreeze"
+    description = "pyautogui/pyscreeze locate (eski yol)"
+
+    def available(self) -> bool:
+        try:
+            import pyautogui  # noqa: F401
+            return True
+        except Exception:
+            return False
+
+    def supports_confidence(self) -> bool:
+        # pyscreeze confidence'ı yalnızca OpenCV ile destekler; yoksa tam eşleşme yapar
+        return _cv2() is not None
+
+    def locate(self, haystack, needle, confidence=None, mode="rgb"):
+        import pyautogui
+
+        kwargs = {}
+        if confidence is not None and self.supports_confidence():
+            kwargs["confidence"] = confidence
+        # Tek kanallı modlarda dönüştürülmüş (L) görüntüler verilir; gri için pyscreeze'in kendi seçeneği
+        if mode == "gray":
+            kwargs["grayscale"] = True
+        else:
+            haystack, needle = as_haystack(haystack, mode).image, as_needle(needle, mode).image
+        if isinstance(haystack, Haystack):
+            haystack = haystack.image
+        if isinstance(needle, Needle):
+            needle = needle.image
+        return pyautogui.locate(needle, haystack, **kwargs)
+
+
+MATCHERS: dict[str, Matcher] = {m.name: m for m in (OpenCVMatcher(), NumpyMatcher(), PyscreezeMatcher())}
+_active: Matcher | None = None
+
+
+def get_matcher(name: str | None = None) -> Matcher:
+    """İsim verilirse o arka uç (kullanılamıyorsa ValueError), yoksa seçili ya da ilk kullanılabilir olan."""
+    if name:
+        matcher = MATCHERS.get(name)
+        if matcher is None:
+            raise ValueError(f"Bilinmeyen eşleyici: {name} (seçenekler: {', '.join(MATCHERS)})")
+        if not matcher.available():
+            raise ValueError(f"Eşleyici kullanılamıyor: {name}")
+        return matcher
+    if _active is not None:
+        return _active
+    for matcher in MATCHERS.values():
+        if matcher.available():
+            return matcher
+    raise ValueError("Kullanılabilir eşleyici yok (opencv, numpy veya pyautogui gerekli)")
+
+
+def set_matcher(name: str | None) -> Matcher | None:
+    # None / "auto" → otomatik seçim
+    global _active
+    _active = None if not name or name == "auto" else get_matcher(name)
+    return _active
+
+
+def capabilities() -> dict[str, dict]:
+    return {
+        name: {
+            "available": m.available(),
+            "confidence": m.available() and m.supports_confidence(),
+            "description": m.description,
+        }
+        for name, m in MATCHERS.items()
+    }
+
+
+def synthetic_screen(rng: random.Random, size: tuple[int, int]) -> Image.Image:
+    img = Image.new("RGB", size, tuple(rng.randrange(200, 256) for _ in range(3)))
+    draw = ImageDraw.Draw(img)
+    for _ in range(size[0] * size[1] // 4000):
+        x, y = rng.randrange(size[0]), rng.randrange(size[1])
+        bw, bh = rng.randrange(20, 220), rng.randrange(12, 90)
+        color = tuple(rng.randrange(256) for _ in range(3))
+        draw.rectangle((x, y, x + bw, y + bh), fill=color, outline=(0, 0, 0))
+        if rng.random() < 0.6:
+            draw.text((x + 4, y + 2), "".join(rng.choice("ABCDEFGHabcdefgh0123456789") for _ in range(8)), fill=(0, 0, 0))
+    return img
+
+
+def accuracy_check(cases: int = 40, size: tuple[int, int] = (1280, 720), seed: int = 1) -> float:
+    """Piramit eşleyiciyi sentetik ekranlarda tam (exhaustive) arama ile karşılaştırır."""
+    rng = random.Random(seed)
+    agree = 0
+    t_pyr = t_full = 0.0
+    for i in range(cases):
+        screen = synthetic_screen(rng, size)
+        nw, nh = rng.randrange(24, 160), rng.randrange(16, 100)
+        x, y = rng.randrange(size[0] - nw), rng.randrange(size[1] - nh)
+        needle = screen.crop((x, y, x + nw, y + nh))
+        if i % 4 == 3:
+            # Negatif örnek: şablon başka bir ekrandan
+            needle = synthetic_screen(rng, size).crop((x, y, x + nw, y + nh))
+        confidence = rng.choice((None, 0.95, 0.9, 0.8))
+        if confidence is not None and rng.random() < 0.5:
+            # Hafif gürültü: yalnızca eşik ile eşleşebilir
+            needle = Image.blend(needle, Image.effect_noise(needle.size, 40).convert("RGB"), 0.05)
+
+        start = time.perf_counter()
+        expected = exhaustive_locate(screen, needle, confidence)
+        t_full += time.perf_counter() - start
+        start = time.perf_counter()
+        got = pyramid_locate(screen, needle, confidence)
+        t_pyr += time.perf_counter() - start
+
+        if expected is None:
+            ok = got is None
+        elif got is None:
+            ok = False
+        else:
+            # Eşik üstünde birden çok konum olabilir; pyramid'in bulduğu konum da eşiği geçmeli
+            window = screen.crop((got.left, got.top, got.left + got.width, got.top + got.height))
+            score = float(ncc_map(to_array(window), to_array(needle))[0, 0])
+            ok = score >= (DEFAULT_CONFIDENCE if confidence is None else confidence)
+        agree += ok
+        if not ok:
+            print(f"#{i}: uyuşmazlık exhaustive={expected} pyramid={got} conf={confidence}")
+    print(f"Uyum: {agree}/{cases}  exhaustive={t_full / cases * 1000:.1f}ms  pyramid={t_pyr / cases * 1000:.1f}ms (ortalama)")
+    return agree / cases
+
+
+if __name__ == "__main__":
+    if not available():
+        print("numpy bulunamadı")
+        sys.exit(1)
+    sys.exit(0 if accuracy_check() == 1.0 else 1)
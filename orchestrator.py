@@ -0,0 +1,254 @@
+"""Aynı botun birçok kopyasını paralel çalıştırır: her iş ayrı bir runner.py süreci olarak,
+kendi DISPLAY'inde (ör. Xvfb :101, :102, ...) koşar ve sonuçlar üst sürece satır satır akar.
+
+    python orchestrator.py macro_bot.json --jobs 24 --workers 8 --xvfb --job-timeout 120 --retries 1
+
+stdout'a satır başına bir JSON nesnesi yazılır: çalışanların olayları ("job", "attempt", "display"
+alanları eklenmiş; runner'ın "summary" olayı "worker_summary" olarak), her işin sonunda "job" (başarısızsa
+stderr'in son satırlarıyla) ve en sonda "summary". Tanınmayan seçenekler (ör. --engine async --timeout 30) runner'a geçer.
+Çıkış kodu: 0 tüm işler başarılı, 1 en az bir iş başarısız.
+"""
+
+import argparse
+import json
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+from runner import EXIT_LOAD_ERROR, EXIT_OK
+
+RUNNER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "runner.py")
+# Başarısız işin kaydına eklenen stderr satırı sayısı
+STDERR_TAIL_LINES = 20
+
+
+@dataclass
+class JobResult:
+    job: int
+    display: str | None
+    attempts: int = 0
+    exit_code: int | None = None
+    timed_out: bool = False
+    elapsed_sec: float = 0.0
+    # Son denemenin "run" olayları
+    runs: list[dict] = field(default_factory=list)
+    # Son denemenin stderr çıktısının son satırları (ör. traceback)
+    stderr_tail: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.exit_code == EXIT_OK
+
+
+class VirtualDisplay:
+    """Xvfb ile sanal ekran; 'with' bloğu boyunca açık kalır."""
+
+    def __init__(self, number: int, size: str = "1920x1080x24") -> None:
+        self.number = number
+        self.size = size
+        self.name = f":{number}"
+        self._proc: subprocess.Popen | None = None
+
+    def __enter__(self) -> "VirtualDisplay":
+        if shutil.which("Xvfb") is None:
+            raise RuntimeError("Xvfb bulunamadı (--xvfb için kurulu olmalı)")
+        self._proc = subprocess.Popen(
+            ["Xvfb", self.name, "-screen", "0", self.size, "-nolisten", "tcp"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        # X soketi oluşana kadar bekle
+        socket = f"/tmp/.X11-unix/X{self.number}"
+        deadline = time.monotonic() + 5.0
+        while not os.path.exists(socket):
+            if self._proc.poll() is not None or time.monotonic() > deadline:
+                self.__exit__()
+                raise RuntimeError(f"Xvfb {self.name} başlatılamadı")
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        if self._proc is not None:
+            self._proc.terminate()
+            try:
+                self._proc.wait(timeout=5.0)
+            except subprocess.TimeoutExpired:
+                self._proc.kill()
+            self._proc = None
+
+
+class Orchestrator:
+    """İşleri 'workers' kadar eşzamanlı runner sürecine dağıtır; zaman aşımı ve yeniden deneme uygular."""
+
+    def __init__(
+        self,
+        bot_path: str,
+        runner_args: list[str] | None = None,
+        workers: int | None = None,
+        timeout_sec: float | None = None,
+        retries: int = 0,
+        displays: list[str | None] | None = None,
+        emit=None,
+    ) -> None:
+        self.bot_path = bot_path
+        self.runner_args = list(runner_args or [])
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.timeout_sec = timeout_sec
+        self.retries = max(0, retries)
+        # Çalışan i, displays[i % len(displays)] üzerinde koşar (None → miras alınan DISPLAY)
+        self.displays = displays or [None]
+        self.emit = emit or (lambda event: None)
+        self._emit_lock = threading.Lock()
+
+    def _send(self, event: dict) -> None:
+        with self._emit_lock:
+            self.emit(event)
+
+    def _attempt(self, result: JobResult, attempt: int) -> None:
+        env = dict(os.environ)
+        if result.display:
+            env["DISPLAY"] = result.display
+        cmd = [sys.executable, RUNNER, self.bot_path, *self.runner_args]
+        proc = subprocess.Popen(cmd, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, bufsize=1)
+        # stderr ayrı iş parçacığında boşaltılır (dolan boru süreci kilitlemesin); yalnızca sonu tutulur
+        tail: deque[str] = deque(maxlen=STDERR_TAIL_LINES)
+        drain = threading.Thread(target=lambda: tail.extend(line.rstrip("\n") for line in proc.stderr), daemon=True)
+        drain.start()
+        timer = None
+        if self.timeout_sec:
+            def kill() -> None:
+                result.timed_out = True
+                proc.kill()
+
+            timer = threading.Timer(self.timeout_sec, kill)
+            timer.daemon = True
+            timer.start()
+        result.runs = []
+        try:
+            for line in proc.stdout:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                event.update(job=result.job, attempt=attempt, display=result.display)
+                if event.get("event") == "summary":
+                    # Üst sürecin kendi "summary" olayıyla karışmasın
+                    event["event"] = "worker_summary"
+                if event.get("event") == "run":
+                    result.runs.append(event)
+                self._send(event)
+            result.exit_code = proc.wait()
+        finally:
+            if timer is not None:
+                timer.cancel()
+            drain.join(timeout=5.0)
+            result.stderr_tail = list(tail)
+
+    def run_job(self, job: int, display: str | None) -> JobResult:
+        result = JobResult(job, display)
+        started = time.monotonic()
+        for attempt in range(1, self.retries + 2):
+            result.attempts = attempt
+            result.timed_out = False
+            self._attempt(result, attempt)
+            # Yükleme hatası yeniden denemeyle düzelmez
+            if result.ok or result.exit_code == EXIT_LOAD_ERROR:
+                break
+        result.elapsed_sec = round(time.monotonic() - started, 4)
+        self._send({
+            "event": "job",
+            "job": job,
+            "display": display,
+            "ok": result.ok,
+            "exit_code": result.exit_code,
+            "timed_out": result.timed_out,
+            "attempts": result.attempts,
+            "elapsed_sec": result.elapsed_sec,
+            **({} if result.ok else {"stderr_tail": result.stderr_tail}),
+        })
+        return result
+
+    def run(self, jobs: int) -> list[JobResult]:
+        pending: queue.Queue[int] = queue.Queue()
+        for job in range(1, jobs + 1):
+            pending.put(job)
+        results: list[JobResult] = []
+        lock = threading.Lock()
+
+        def worker(index: int) -> None:
+            # Her çalışan kendi ekranına bağlıdır; aynı ekranı iki süreç paylaşmaz (len(displays) >= workers ise)
+            display = self.displays[index % len(self.displays)]
+            while True:
+                try:
+                    job = pending.get_nowait()
+                except queue.Empty:
+                    return
+                result = self.run_job(job, display)
+                with lock:
+                    results.append(result)
+
+        threads = [
+            threading.Thread(target=worker, args=(i,), name=f"orchestrator-{i}", daemon=True)
+            for i in range(min(self.workers, jobs))
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return sorted(results, key=lambda r: r.job)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bir botu çok sayıda süreçte paralel çalıştırır.")
+    parser.add_argument("bot", help="save_bot ile kaydedilmiş JSON dosyası ya da .botz paketi")
+    parser.add_argument("--jobs", type=int, default=1, help="Toplam iş (runner süreci) sayısı")
+    parser.add_argument("--workers", type=int, default=None, help="Eşzamanlı süreç sınırı (varsayılan: çekirdek sayısı)")
+    parser.add_argument("--job-timeout", type=float, default=None, help="Deneme başına saniye cinsinden süre sınırı")
+    parser.add_argument("--retries", type=int, default=0, help="Başarısız işin yeniden deneme sayısı")
+    parser.add_argument("--displays", default="", help="Virgülle ayrılmış DISPLAY listesi (ör. :1,:2)")
+    parser.add_argument("--xvfb", action="store_true", help="Her çalışan için bir Xvfb ekranı başlat")
+    parser.add_argument("--xvfb-base", type=int, default=100, help="İlk Xvfb ekran numarası")
+    parser.add_argument("--xvfb-size", default="1920x1080x24")
+    args, runner_args = parser.parse_known_args(argv)
+
+    def emit(event: dict) -> None:
+        print(json.dumps(event, ensure_ascii=False), flush=True)
+
+    workers = max(1, min(args.workers or os.cpu_count() or 1, args.jobs))
+    virtual: list[VirtualDisplay] = []
+    try:
+        if args.xvfb:
+            for i in range(workers):
+                virtual.append(VirtualDisplay(args.xvfb_base + i, args.xvfb_size).__enter__())
+            displays = [d.name for d in virtual]
+        else:
+            displays = [d.strip() for d in args.displays.split(",") if d.strip()] or None
+        orchestrator = Orchestrator(args.bot, runner_args, workers, args.job_timeout, args.retries, displays, emit)
+        started = time.monotonic()
+        results = orchestrator.run(args.jobs)
+    except RuntimeError as e:
+        emit({"event": "error", "error": str(e)})
+        return 1
+    finally:
+        for display in virtual:
+            display.__exit__()
+
+    failed = [r.job for r in results if not r.ok]
+    emit({
+        "event": "summary",
+        "jobs": len(results),
+        "failed": failed,
+        "retried": sum(1 for r in results if r.attempts > 1),
+        "elapsed_sec": round(time.monotonic() - started, 4),
+    })
+    return 0 if not failed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
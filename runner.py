@@ -0,0 +1,150 @@
+"""Kayıtlı bir bot JSON dosyasını arayüz olmadan çalıştırır (cron, orkestratör).
+
+Örnek:
+    python runner.py macro_bot.json --func Varsayılan --capture mss --repeat 3
+
+stdout'a satır başına bir JSON nesnesi yazılır (statik analizin bulduğu her sorun için "issue",
+"run" ve "summary" olayları; --verbose ile "status" da). Program varsayılan olarak iyileştirilmiş
+haliyle çalıştırılır (bkz. analysis.optimize). Çıkış kodları: 0 tüm çalıştırmalar başarılı,
+1 en az bir çalıştırma hata verdi, 2 bot dosyası/ayarlar yüklenemedi.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+import matchers
+from analysis import ERROR, analyze, optimize
+from engine import ExecutionContext, collect_reachable_images, compile_program, load_bot
+from frames import background_capturer, frame_provider
+from locate import locate_hints, match_cache, scale_memory
+from templates import template_cache
+from tracing import tracer
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_LOAD_ERROR = 2
+
+
+def emit(event: str, **fields) -> None:
+    print(json.dumps({"event": event, **fields}, ensure_ascii=False), flush=True)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Bot JSON dosyasını arayüzsüz çalıştırır.")
+    parser.add_argument("bot", help="save_bot ile kaydedilmiş JSON dosyası ya da .botz paketi")
+    parser.add_argument("--func", help="Çalıştırılacak fonksiyon (varsayılan: dosyadaki current_func)")
+    parser.add_argument("--capture", default="auto", help="Yakalama kaynağı: auto, mss, pyautogui, replay:<yol>")
+    parser.add_argument("--matcher", default="auto", help="Eşleyici: auto, " + ", ".join(matchers.MATCHERS))
+    parser.add_argument("--repeat", type=int, default=1, help="Fonksiyonun kaç kez çalıştırılacağı")
+    parser.add_argument("--engine", choices=("thread", "async"), default="thread", help="Adım motoru")
+    parser.add_argument("--timeout", type=float, default=None, help="Çalıştırma başına süre sınırı (yalnızca async motor)")
+    parser.add_argument("--bg-fps", type=float, default=0.0, help="> 0 ise arka plan yakalama bu FPS ile açılır")
+    parser.add_argument("--no-optimize", action="store_true", help="Programı iyileştirmeden (ölü adımlar, atlama zincirleri) çalıştır")
+    parser.add_argument("--strict", action="store_true", help="Statik analiz hata bulursa çalıştırma (çıkış kodu 2)")
+    parser.add_argument("--stop-on-failure", action="store_true", help="İlk hatada kalan tekrarları atla")
+    parser.add_argument("--trace", help="Zamanlama izini bu dosyaya yaz (.jsonl → JSON satırları, diğerleri → Chrome biçimi)")
+    parser.add_argument("--verbose", action="store_true", help="Adım durum mesajlarını da yaz")
+    return parser.parse_args(argv)
+
+
+def _wait_summary(ctx: ExecutionContext) -> dict:
+    waits = [stats for _number, stats in ctx.wait_stats]
+    return {
+        "waits": len(waits),
+        "polls": sum(s.polls for s in waits),
+        "matches": sum(s.matches for s in waits),
+        "skipped": sum(s.skipped for s in waits),
+    }
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.trace:
+        tracer.enable()
+    try:
+        data = load_bot(args.bot)
+        func_name = args.func or data.get("current_func") or next(iter(data["functions"]), None)
+        if func_name not in data["functions"]:
+            raise ValueError(f"Fonksiyon bulunamadı: {func_name}")
+        issues = analyze(data["functions"])
+        for issue in issues:
+            emit("issue", severity=issue.severity, func=issue.func, step=issue.step, message=issue.message)
+        if args.strict and any(issue.severity == ERROR for issue in issues):
+            raise ValueError("Statik analiz hataları (--strict)")
+        optimized = None if args.no_optimize else optimize(data["functions"])
+        functions = data["functions"] if optimized is None else optimized.functions
+        program = compile_program(functions, data.get("color_mode"), data.get("scales"))
+        frame_provider.set_source(args.capture)
+        matchers.set_matcher(args.matcher)
+        template_cache.preload(collect_reachable_images(data["functions"], func_name))
+    except Exception as e:
+        emit("error", stage="load", error=f"{type(e).__name__}: {e}")
+        return EXIT_LOAD_ERROR
+
+    status = (lambda text: emit("status", text=text)) if args.verbose else None
+    variables: dict = {}
+    failures = 0
+    started = time.monotonic()
+    if args.bg_fps > 0:
+        background_capturer.fps = args.bg_fps
+        background_capturer.start()
+    try:
+        for iteration in range(1, max(1, args.repeat) + 1):
+            run_started = time.monotonic()
+            error = None
+            try:
+                if args.engine == "async":
+                    from async_engine import AsyncExecutionContext
+
+                    ctx = AsyncExecutionContext(program, variables, status)
+                    asyncio.run(ctx.run(func_name, args.timeout))
+                else:
+                    ctx = ExecutionContext(program, variables, status)
+                    ctx.run(func_name)
+            except KeyboardInterrupt:
+                emit("error", stage="run", error="KeyboardInterrupt")
+                return EXIT_FAILED
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                failures += 1
+            emit(
+                "run",
+                iteration=iteration,
+                func=func_name,
+                ok=error is None,
+                error=error,
+                elapsed_sec=round(time.monotonic() - run_started, 4),
+                **_wait_summary(ctx),
+            )
+            if error is not None and args.stop_on_failure:
+                break
+    finally:
+        background_capturer.stop()
+        try:
+            scale_memory.save()
+        except OSError:
+            pass
+        if args.trace:
+            tracer.export(args.trace)
+
+    emit(
+        "summary",
+        func=func_name,
+        runs=iteration,
+        failures=failures,
+        elapsed_sec=round(time.monotonic() - started, 4),
+        captures=frame_provider.captures,
+        hints=locate_hints.summary(),
+        match_cache=match_cache.summary(),
+        variables=variables,
+        **({"optimized": optimized.summary()} if optimized is not None else {}),
+        **({"trace": tracer.summary()} if tracer.enabled else {}),
+    )
+    return EXIT_OK if failures == 0 else EXIT_FAILED
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,6 @@
 from PySide6.QtWidgets import QApplication, QWidget, QRubberBand
 from PySide6.QtCore import Qt, QRect, QPoint, QSize, QEventLoop, Signal
 from PySide6.QtGui import QGuiApplication, QPainter, QColor
-import pyautogui
 
 class SelectionOverlay(QWidget):
     finished = Signal()
@@ -111,6 +110,8 @@ def select_region() -> list[int] | None:
 
 
 if __name__ == "__main__":
+    import pyautogui
+
     region = select_region()
     if region:
         pyautogui.screenshot(region=tuple(region)).save("screenshot.png")
@@ -0,0 +1,113 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from PIL import Image
+
+from tracing import DECODE, tracer
+
+
+class TemplateCache:
+    """Çözülmüş (decode edilmiş) şablon görselleri için süreç genelinde LRU önbellek."""
+
+    def __init__(self, max_entries: int = 256, revalidate_sec: float = 2.0) -> None:
+        self.max_entries = max_entries
+        # Dosya değişikliği (mtime/size) en fazla bu aralıkla kontrol edilir
+        self.revalidate_sec = revalidate_sec
+        self._entries: OrderedDict[str, list] = OrderedDict()
+        # Dosyası olmayan (ör. bot paketinden gelen) şablonlar: yol → (yükleyici, {türetilmiş anahtar: üretici})
+        self._registered: dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _stamp(self, path: str) -> tuple[int, int]:
+        # Kayıtlı şablonlar değişmez; dosya sistemi yoklanmaz
+        if path in self._registered:
+            return 0, 0
+        st = os.stat(path)
+        return st.st_mtime_ns, st.st_size
+
+    def get(self, image_path: str) -> Image.Image:
+        key = os.path.abspath(image_path)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            stamp, checked_at, needle, _derived = entry
+            fresh = now - checked_at < self.revalidate_sec
+            if fresh or self._stamp(key) == stamp:
+                with self._lock:
+                    if not fresh:
+                        entry[1] = now
+                    if key in self._entries:
+                        self._entries.move_to_end(key)
+                    self.hits += 1
+                return needle
+
+        stamp = self._stamp(key)
+        registered = self._registered.get(key)
+        if registered is not None:
+            with tracer.span("decode", DECODE, {"path": os.path.basename(key), "registered": True}):
+                needle = registered[0]()
+        else:
+            with tracer.span("decode", DECODE, {"path": os.path.basename(key)}), Image.open(key) as img:
+                img.load()
+                needle = img.convert("RGB")
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = [stamp, now, needle, {}]
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return needle
+
+    def derived(self, image_path: str, key, factory):
+        """Şablondan türetilmiş bir nesne (ör. gri tonlamalı, NCC istatistikleri hesaplanmış hali).
+        factory(image) girdi başına bir kez çağrılır; dosya değişince görselle birlikte yenilenir."""
+        image = self.get(image_path)
+        with self._lock:
+            entry = self._entries.get(os.path.abspath(image_path))
+        if entry is None or entry[2] is not image:
+            return factory(image)
+        value = entry[3].get(key)
+        if value is None:
+            prepared = self._registered.get(os.path.abspath(image_path), (None, {}))[1].get(key)
+            value = entry[3][key] = prepared() if prepared is not None else factory(image)
+        return value
+
+    def register(self, image_path: str, loader, prepared: dict | None = None) -> None:
+        """Diskte dosyası olmayan bir şablonu bu yolla kullanılabilir yapar. loader() RGB görseli,
+        prepared[anahtar]() ise derived() için hazır nesneyi döndürür; ikisi de ilk kullanımda çağrılır."""
+        key = os.path.abspath(image_path)
+        with self._lock:
+            self._registered[key] = (loader, dict(prepared or {}))
+            self._entries.pop(key, None)
+
+    def preload(self, image_paths) -> int:
+        """Şablonları önceden çözer; önbellek hepsini tutacak kadar büyütülür, böylece ilk
+        yoklamada disk okunmaz."""
+        paths = list(dict.fromkeys(os.path.abspath(p) for p in image_paths))
+        missing = [p for p in paths if not os.path.isfile(p) and p not in self._registered]
+        if missing:
+            raise FileNotFoundError("Bulunamayan görseller: " + ", ".join(os.path.basename(p) for p in missing))
+        with self._lock:
+            self.max_entries = max(self.max_entries, len(paths))
+        for p in paths:
+            self.get(p)
+        with self._lock:
+            evicted = [p for p in paths if p not in self._entries]
+        if evicted:
+            raise RuntimeError("Önceden yüklenen şablonlar önbellekten düştü: " + ", ".join(os.path.basename(p) for p in evicted))
+        return len(paths)
+
+    def invalidate(self, image_path: str | None = None) -> None:
+        with self._lock:
+            if image_path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(image_path), None)
+
+
+template_cache = TemplateCache()
@@ -0,0 +1,150 @@
+import random
+
+import pytest
+
+import engine
+from analysis import ERROR, analyze, optimize
+from engine import (
+    OP_CLICK, OP_IF, OP_SET_VAR, OP_WAIT_ANY, OP_WAIT_APPEAR, OP_WAIT_DISAPPEAR, ExecutionContext, compile_program,
+)
+
+# Rastgele programlarda kullanılan atlama değerleri: boş, geçersiz, 0 ve aralık dışı dahil
+_ODD_TARGETS = (None, "", "abc", 0, "0", "-2", "99")
+
+
+class _Stop(Exception):
+    pass
+
+
+class _Oracle:
+    """Görsel işlemlerinin yerine geçer: sonuçlar tohumdan belirlenir, tıklama ve dal seçimleri kaydedilir.
+    Görünme/kaybolma beklemeleri görsel başına sabittir (iyileştirici aynı görseli bekleyen adımları birleştirir)."""
+
+    def __init__(self, seed, max_events: int = 40, max_steps: int = 1000) -> None:
+        self.seed = seed
+        self.max_events = max_events
+        self.max_steps = max_steps
+        self.events: list[tuple] = []
+        self.steps = 0
+        self.visits: dict[int, int] = {}
+        self.waits: dict[tuple, bool] = {}
+
+    def _tick(self) -> None:
+        self.steps += 1
+        if self.steps > self.max_steps or len(self.events) >= self.max_events:
+            raise _Stop
+
+    def _chance(self, *key) -> random.Random:
+        return random.Random(":".join(str(k) for k in (self.seed, *key)))
+
+    def _visit(self, step) -> int:
+        self.visits[step.number] = self.visits.get(step.number, 0) + 1
+        return self.visits[step.number]
+
+    def click(self, ctx, step) -> bool:
+        self._tick()
+        ok = self._chance(step.number, self._visit(step)).random() < 0.5
+        self.events.append(("click", step.number, ok))
+        return ok
+
+    def wait(self, ctx, step) -> bool:
+        self._tick()
+        key = (step.op, step.image)
+        if key not in self.waits:
+            self.waits[key] = self._chance(*key).random() < 0.5
+        return self.waits[key]
+
+    def wait_any(self, ctx, step) -> bool:
+        self._tick()
+        rng = self._chance(step.number, self._visit(step))
+        index = rng.randrange(len(step.branch_images) + 1) if step.branch_images else len(step.branch_images)
+        self.events.append(("any", step.number, index))
+        if index == len(step.branch_images):
+            return False
+        ctx.jump = step.branch_targets[index]
+        return True
+
+    def wrap(self, handler):
+        def run(ctx, step):
+            self._tick()
+            return handler(ctx, step)
+        return run
+
+
+def _run(functions: dict, monkeypatch, seed, func: str = "main"):
+    """Programı gerçek yorumlayıcıyla (run_steps) çalıştırır; görsel işlemleri _Oracle'dan gelir."""
+    oracle = _Oracle(seed)
+    with monkeypatch.context() as m:
+        m.setitem(engine.OP_HANDLERS, OP_CLICK, oracle.click)
+        m.setitem(engine.OP_HANDLERS, OP_WAIT_APPEAR, oracle.wait)
+        m.setitem(engine.OP_HANDLERS, OP_WAIT_DISAPPEAR, oracle.wait)
+        m.setitem(engine.OP_HANDLERS, OP_WAIT_ANY, oracle.wait_any)
+        m.setitem(engine.OP_HANDLERS, OP_IF, oracle.wrap(engine.OP_HANDLERS[OP_IF]))
+        m.setitem(engine.OP_HANDLERS, OP_SET_VAR, oracle.wrap(engine.OP_HANDLERS[OP_SET_VAR]))
+        program = compile_program(functions)
+    variables: dict = {}
+    try:
+        ExecutionContext(program, variables).run(func)
+        end = "done"
+    except _Stop:
+        # Sonsuz döngü: sınırda kesilir; değişkenler adım sayısına bağlı olduğundan karşılaştırılmaz
+        return oracle.events, "stopped", None
+    except Exception as e:
+        end = type(e).__name__
+    return oracle.events, end, variables
+
+
+def _target(rng: random.Random, count: int):
+    if rng.random() < 0.25:
+        return rng.choice(_ODD_TARGETS)
+    return str(rng.randrange(1, count + 2)) if rng.random() < 0.6 else None
+
+
+def _random_program(seed) -> list[dict]:
+    rng = random.Random(seed)
+    count = rng.randrange(1, 12)
+    steps = []
+    for _ in range(count):
+        op = rng.choice((OP_CLICK, OP_WAIT_APPEAR, OP_WAIT_APPEAR, OP_WAIT_DISAPPEAR, OP_WAIT_ANY, OP_IF, OP_IF, OP_SET_VAR))
+        step = {"op": op, "image": rng.choice("ab"), "next_ok": _target(rng, count), "next_fail": _target(rng, count)}
+        if op == OP_WAIT_ANY:
+            step["images"] = [{"image": rng.choice("abc"), "next": _target(rng, count)} for _ in range(rng.randrange(1, 4))]
+        elif op in (OP_IF, OP_SET_VAR):
+            step.update(var_name=rng.choice("xy"), var_type="int", var_value=str(rng.randrange(3)), cmp=rng.choice(("==", "!=")))
+            if op == OP_IF and rng.random() < 0.3:
+                step["next_fail"] = step["next_ok"]
+        steps.append(step)
+    return steps
+
+
+def test_optimize_keeps_behaviour(monkeypatch):
+    for seed in range(1500):
+        functions = {"main": _random_program(seed)}
+        optimized = optimize(functions).functions
+        assert _run(optimized, monkeypatch, seed) == _run(functions, monkeypatch, seed), f"tohum {seed}"
+
+
+def test_optimize_invalid_branch_falls_back_to_next_ok(monkeypatch):
+    functions = {"main": [
+        {"op": OP_WAIT_ANY, "next_ok": "1", "images": [{"image": "x", "next": "abc"}]},
+        {"op": OP_CLICK, "image": "x"},
+    ]}
+    optimized = optimize(functions).functions
+    assert optimized["main"][0]["images"][0]["next"] in (None, "1")
+    for seed in range(20):
+        assert _run(optimized, monkeypatch, seed) == _run(functions, monkeypatch, seed)
+
+
+def test_analyze_reports_invalid_branch_target():
+    functions = {"main": [{"op": OP_WAIT_ANY, "images": [{"image": "x", "next": "abc"}]}]}
+    messages = [issue.message for issue in analyze(functions) if issue.severity == ERROR]
+    assert any("'abc'" in m and "Başarılı→ hedefine gidilir" in m for m in messages)
+
+
+@pytest.mark.parametrize("value", ["", None, "abc", 0, "0", "-2", "99"])
+def test_parse_target_matches_engine(monkeypatch, value):
+    functions = {"main": [
+        {"op": OP_CLICK, "image": "a", "next_ok": value, "next_fail": value},
+        {"op": OP_CLICK, "image": "b"},
+    ]}
+    assert _run(optimize(functions).functions, monkeypatch, 1) == _run(functions, monkeypatch, 1)
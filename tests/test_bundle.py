@@ -0,0 +1,108 @@
+import os
+import random
+
+import pytest
+from PIL import Image
+
+import matchers
+from bundle import load_bundle, save_bundle
+from engine import OP_CLICK, OP_WAIT_ANY, OP_WAIT_APPEAR
+from templates import template_cache
+
+
+def _image(path, seed: int, size=(24, 16)) -> str:
+    rng = random.Random(seed)
+    Image.frombytes("RGB", size, rng.randbytes(size[0] * size[1] * 3)).save(path)
+    return str(path)
+
+
+@pytest.fixture
+def bot(tmp_path):
+    a = _image(tmp_path / "a.png", 1)
+    b = _image(tmp_path / "b.png", 2, (10, 30))
+    # a.png ile aynı içerik: pakete tek kopya yazılmalı
+    copy = tmp_path / "a_copy.png"
+    copy.write_bytes((tmp_path / "a.png").read_bytes())
+    return {
+        "current_func": "main",
+        "color_mode": "gray",
+        "functions": {
+            "main": [
+                {"op": OP_CLICK, "image": a},
+                {"op": OP_WAIT_ANY, "images": [{"image": b, "next": "1"}, {"image": str(copy)}]},
+            ],
+            "sub": [{"op": OP_WAIT_APPEAR, "image": b}],
+        },
+    }
+
+
+def _pixels(image: Image.Image) -> bytes:
+    return image.convert("RGB").tobytes()
+
+
+def _images(data: dict) -> list[str]:
+    main, sub = data["functions"]["main"], data["functions"]["sub"]
+    return [main[0]["image"], main[1]["images"][0]["image"], main[1]["images"][1]["image"], sub[0]["image"]]
+
+
+def test_round_trip(bot, tmp_path):
+    path = str(tmp_path / "bot.botz")
+    summary = save_bundle(bot, path)
+    assert summary["templates"] == 2
+    if matchers.available():
+        assert summary["modes"] == ["rgb", "gray"]
+        assert summary["arrays"] == 4
+
+    data = load_bundle(path)
+    assert data["current_func"] == "main"
+    assert data["functions"]["main"][1]["images"][0]["next"] == "1"
+    originals = _images(bot)
+    for loaded, original in zip(_images(data), originals):
+        assert loaded.startswith(path + os.sep)
+        with Image.open(original) as img:
+            assert _pixels(template_cache.get(loaded)) == _pixels(img)
+    # Aynı içerikli iki dosya aynı paket üyesine çözülür
+    assert _images(data)[0] == _images(data)[2]
+
+
+@pytest.mark.skipif(not matchers.available(), reason="numpy yok")
+def test_prepared_arrays_match_conversion(bot, tmp_path):
+    path = str(tmp_path / "bot.botz")
+    save_bundle(bot, path)
+    for loaded, original in zip(_images(load_bundle(path)), _images(bot)):
+        needle = template_cache.derived(loaded, ("needle", "gray"), lambda image: None)
+        with Image.open(original) as img:
+            expected = matchers.Needle(img.convert("RGB"), "gray")
+        assert needle.size == expected.size
+        assert (needle.array() == expected.array()).all()
+
+
+def test_round_trip_without_arrays(bot, tmp_path):
+    path = str(tmp_path / "bot.botz")
+    assert save_bundle(bot, path, arrays=False)["arrays"] == 0
+    data = load_bundle(path)
+    with Image.open(_images(bot)[1]) as img:
+        assert _pixels(template_cache.get(_images(data)[1])) == _pixels(img)
+
+
+def test_extract(bot, tmp_path):
+    path = str(tmp_path / "bot.botz")
+    save_bundle(bot, path)
+    out = tmp_path / "out"
+    out.mkdir()
+    data = load_bundle(path, extract_to=str(out))
+    for loaded, original in zip(_images(data), _images(bot)):
+        assert os.path.dirname(loaded) == str(out)
+        with Image.open(loaded) as a, Image.open(original) as b:
+            assert _pixels(a) == _pixels(b)
+
+
+def test_failed_save_leaves_no_temp_file(bot, tmp_path):
+    path = tmp_path / "bot.botz"
+    save_bundle(bot, str(path))
+    before = path.read_bytes()
+    bot["functions"]["sub"][0]["image"] = str(tmp_path / "missing.png")
+    with pytest.raises(FileNotFoundError):
+        save_bundle(bot, str(path))
+    assert sorted(os.listdir(tmp_path)) == ["a.png", "a_copy.png", "b.png", "bot.botz"]
+    assert path.read_bytes() == before
@@ -0,0 +1,145 @@
+import pytest
+
+import engine
+from analysis import WARNING, analyze
+from engine import OP_CALL, OP_CLICK, OP_SET_VAR, OP_WAIT_ANY, ExecutionContext, compile_program, parse_jump
+
+
+@pytest.fixture
+def clicks(monkeypatch):
+    """Resme Tıkla yerine geçer: sonuç görsel adına göre ("ok*" başarılı), tıklanan adım numaraları kaydedilir."""
+    visited: list[int] = []
+
+    def click(ctx, step) -> bool:
+        visited.append(step.number)
+        if len(visited) > 100:
+            raise RuntimeError("sonsuz döngü")
+        return step.image.startswith("ok")
+
+    monkeypatch.setitem(engine.OP_HANDLERS, OP_CLICK, click)
+    return visited
+
+
+@pytest.fixture
+def wait_any(monkeypatch):
+    """Resimlerden Birini Bekle yerine geçer: choice[0] sıradaki görülen dalın indeksi (None → zaman aşımı)."""
+    choice: list[int | None] = [None]
+
+    def handler(ctx, step) -> bool:
+        index = choice[0]
+        if index is None:
+            return False
+        ctx.jump = step.branch_targets[index]
+        return True
+
+    monkeypatch.setitem(engine.OP_HANDLERS, OP_WAIT_ANY, handler)
+    return choice
+
+
+def _run(functions: dict, func: str = "main") -> dict:
+    variables: dict = {}
+    ExecutionContext(compile_program(functions), variables).run(func)
+    return variables
+
+
+def _click(image: str = "ok", **fields) -> dict:
+    return {"op": OP_CLICK, "image": image, **fields}
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [(None, None), ("", None), ("abc", None), ("3", 2), (3, 2), (0, -1), ("0", -1), ("-2", -3)],
+)
+def test_parse_jump(value, expected):
+    assert parse_jump(value) == expected
+
+
+@pytest.mark.parametrize("target", [None, "", "abc"])
+def test_empty_or_invalid_target_goes_to_next_step(clicks, target):
+    _run({"main": [_click(next_ok=target), _click(), _click()]})
+    assert clicks == [1, 2, 3]
+
+
+@pytest.mark.parametrize("target", [0, "0", "-2", "5", "99"])
+def test_out_of_range_target_ends_function(clicks, target):
+    _run({"main": [_click(next_ok=target), _click(), _click()]})
+    assert clicks == [1]
+
+
+def test_next_fail_and_backward_jump(clicks):
+    # 1 başarısız → 3; 3 başarılı → 2 (geri); 2 başarısız → 4 (= n+1, çıkış)
+    _run({"main": [_click("fail", next_fail="3"), _click("fail", next_fail="4"), _click("ok", next_ok="2")]})
+    assert clicks == [1, 3, 2]
+
+
+def test_wait_any_branches(clicks, wait_any):
+    steps = [
+        {"op": OP_WAIT_ANY, "next_ok": "3", "next_fail": "4", "images": [{"image": "a", "next": "2"}, {"image": "b"}, {"image": "c", "next": "abc"}]},
+        _click(next_ok="5"),
+        _click(next_ok="5"),
+        _click(next_ok="5"),
+    ]
+    expected = {0: [2], 1: [3], 2: [3], None: [4]}
+    for choice, visited in expected.items():
+        clicks.clear()
+        wait_any[0] = choice
+        _run({"main": steps})
+        assert clicks == visited, choice
+
+
+def test_failing_call_takes_next_fail(clicks):
+    functions = {
+        "main": [
+            {"op": OP_CALL, "call_func": "broken", "next_ok": "3", "next_fail": "2"},
+            _click(next_ok="4"),
+            _click(next_ok="4"),
+            {"op": OP_CALL, "call_func": "missing", "next_fail": "6"},
+            _click(),
+            _click(),
+        ],
+        # Tanımsız değişkene "+=1": alt fonksiyonda hata → çağrı başarısız
+        "broken": [{"op": OP_SET_VAR, "var_name": "n", "var_value": "+=1"}],
+    }
+    _run(functions)
+    assert clicks == [2, 6]
+
+
+def test_call_returns_to_caller(clicks):
+    functions = {
+        "main": [{"op": OP_CALL, "call_func": "sub"}, _click()],
+        "sub": [_click(next_ok="9")],
+    }
+    _run(functions)
+    assert clicks == [1, 2]
+
+
+def test_set_var_and_increment():
+    variables = _run({"main": [
+        {"op": OP_SET_VAR, "var_name": "n", "var_value": "2", "var_type": "int"},
+        {"op": OP_SET_VAR, "var_name": "n", "var_value": "+=3"},
+    ]})
+    assert variables == {"n": 5}
+
+
+def test_malformed_increment_fails_only_its_step(clicks):
+    # Program yine derlenir; hatalı adım çalışınca başarısız olur
+    variables = _run({"main": [
+        {"op": OP_SET_VAR, "var_name": "n", "var_value": "+=abc", "next_fail": "3"},
+        _click(),
+        {"op": OP_SET_VAR, "var_name": "m", "var_value": "1", "var_type": "int"},
+    ]})
+    assert variables == {"m": 1}
+    assert clicks == []
+
+
+def test_malformed_numbers_use_defaults():
+    raw = {"op": OP_CLICK, "image": "x", "timeout_sec": "", "poll_sec": None, "move_ms": "abc"}
+    step = compile_program({"main": [raw]}).functions["main"][0]
+    assert (step.timeout_sec, step.poll_sec, step.move_sec) == (30.0, 0.5, 0.15)
+    warnings = [issue.message for issue in analyze({"main": [raw]}) if issue.severity == WARNING]
+    assert sum("geçersiz sayı" in m for m in warnings) == 2
+
+
+def test_step_number_uses_origin():
+    program = compile_program({"main": [_click(origin=7), _click()]})
+    assert [step.number for step in program.functions["main"]] == [7, 2]
@@ -0,0 +1,135 @@
+"""Adım zamanlama izi: her adım ve alt çağrı için bir span, içinde yakalama (capture),
+şablon çözme (decode), eşleme (match) ve girdi (input) aşamaları.
+
+Kapalıyken span() paylaşılan boş bir bağlam döndürür (kayıt yok); açıkken olaylar sınırlı bir
+halka tamponda tutulur, bu yüzden üretimde açık bırakılabilir. Dışa aktarma: JSON satırları ya da
+Chrome trace-event biçimi (chrome://tracing, Perfetto).
+
+    tracer.enable()
+    ...
+    tracer.export("trace.json")   # .jsonl → JSON satırları, diğerleri → Chrome biçimi
+
+Ortam değişkeni MACRO_TRACE=1 ile süreç başında açılır; arayüz her çalıştırmanın sonunda izi
+MACRO_TRACE_FILE dosyasına (varsayılan macro_trace.json) yazar.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# Aşama kategorileri
+STEP = "step"
+CALL = "call"
+CAPTURE = "capture"
+DECODE = "decode"
+MATCH = "match"
+INPUT = "input"
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "cat", "args", "start")
+
+    def __init__(self, tracer: "Tracer", name: str, cat: str, args: dict | None) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *_exc):
+        end = time.perf_counter_ns()
+        # deque.append atomiktir; kilit gerekmez
+        self.tracer._events.append((self.name, self.cat, self.start, end - self.start, threading.get_ident(), self.args))
+        return False
+
+
+class Tracer:
+    def __init__(self, max_events: int = 200_000) -> None:
+        self.enabled = False
+        self._events: deque = deque(maxlen=max_events)
+        self._origin_ns = time.perf_counter_ns()
+
+    def enable(self, max_events: int | None = None) -> None:
+        if max_events is not None:
+            self._events = deque(self._events, maxlen=max_events)
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def clear(self) -> None:
+        self._events.clear()
+        self._origin_ns = time.perf_counter_ns()
+
+    def span(self, name: str, cat: str, args: dict | None = None):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, cat, args)
+
+    def events(self) -> list[dict]:
+        origin = self._origin_ns
+        return [
+            {"name": name, "cat": cat, "start_us": (start - origin) / 1000, "dur_us": dur / 1000, "tid": tid, "args": args or {}}
+            for name, cat, start, dur, tid, args in list(self._events)
+        ]
+
+    def summary(self) -> dict[str, dict]:
+        # Kategori başına toplam süre ve span sayısı
+        totals: dict[str, dict] = {}
+        for _name, cat, _start, dur, _tid, _args in list(self._events):
+            entry = totals.setdefault(cat, {"count": 0, "total_ms": 0.0})
+            entry["count"] += 1
+            entry["total_ms"] += dur / 1e6
+        for entry in totals.values():
+            entry["total_ms"] = round(entry["total_ms"], 3)
+        return totals
+
+    def export_jsonl(self, path: str) -> int:
+        events = self.events()
+        with open(path, "w", encoding="utf-8") as f:
+            for event in events:
+                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+        return len(events)
+
+    def export_chrome(self, path: str) -> int:
+        pid = os.getpid()
+        events = [
+            {"name": e["name"], "cat": e["cat"], "ph": "X", "ts": e["start_us"], "dur": e["dur_us"], "pid": pid, "tid": e["tid"], "args": e["args"]}
+            for e in self.events()
+        ]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+        return len(events)
+
+    def export(self, path: str) -> int:
+        if path.lower().endswith(".jsonl"):
+            return self.export_jsonl(path)
+        return self.export_chrome(path)
+
+
+def env_trace_path() -> str:
+    # MACRO_TRACE ile açılan izin dışa aktarılacağı dosya (runner'da --trace bunun yerine geçer)
+    return os.environ.get("MACRO_TRACE_FILE") or "macro_trace.json"
+
+
+tracer = Tracer()
+if os.environ.get("MACRO_TRACE", "") not in ("", "0"):
+    tracer.enable()